@@ -1,24 +1,36 @@
+import time
+LAUNCH_TIME = time.perf_counter()  # --trace-startup measures from here
 import pygame
+import numpy as np
 import random
 import math
 import sys
 import os
-import requests
 import json
 import threading
-import time
-
+import queue
+import itertools
+import struct
+import zlib
+import pickle
+import re
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
 
-from collections import deque
 
 
 GROK_API_KEY = os.getenv('GROK_API_KEY')
-GROK_API_URL = "https://api.x.ai/v1/chat/completions"
+# Point GROK_API_URL at a local stand-in server to test quote generation offline
+GROK_API_URL = os.getenv('GROK_API_URL', "https://api.x.ai/v1/chat/completions")
 
 # Whether to read quotes from text file or generate with API
 USE_TEXT_QUOTES = True
 
-pygame.init()
+# pygame subsystems start on first use: the display and fonts with a windowed Game, the mixer
+# with the first sound decode, and headless games start none of them
 
 NEXT_QUOTES = {
     'appeared': [],
@@ -31,6 +43,12 @@ NEXT_QUOTES = {
 SCREEN_WIDTH, SCREEN_HEIGHT = 1920, 1080
 FPS = 60
 
+# Fixed timestep: the simulation always steps at FPS, rendering runs at RENDER_FPS (0 = uncapped)
+SIM_DT = 1.0 / FPS
+RENDER_FPS = 120
+MAX_CATCH_UP_STEPS = 5
+MAX_FRAME_TIME = 0.25
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (224, 224, 224)
@@ -68,7 +86,7 @@ SEGMENTS_PER_FOOD = 3
 
 # Snake constants
 SNAKE_GROW_RATE = 0.1
-SNAKE_SEG_SPEED_MULTIPLIER = 2
+SNAKE_INITIAL_CAPACITY = 64
 SNAKE_EYE_LERP_FACTOR = 0.15
 SNAKE_IDLE_DIST_THRESHOLD = 2
 SNAKE_FRICTION = 0.7
@@ -76,6 +94,9 @@ SNAKE_DRIFT_FORCE = 0.002
 SNAKE_ACCEL = 0.2
 SNAKE_BUFFER_MULTIPLIER = 5.0
 REST_POSITION_THRESHOLD = 10
+# Self collision: segments closer to the head than this are neighbours and never collide
+SELF_COLLISION_MIN_SEGMENT = 25
+SELF_COLLISION_CELL_SIZE = SNAKE_RADIUS * 4
 
 # Eye constants
 EYE_RADIUS = 12
@@ -112,7 +133,18 @@ EXPLOSION_RING_PROGRESS_OFFSET = 0.1
 EXPLOSION_RING_THICKNESS_BASE = 14
 EXPLOSION_RING_THICKNESS_DECREMENT = 2
 
+# Sprite cache
+SPRITE_SCALE_STEPS = 10  # scales are quantized to 1/SPRITE_SCALE_STEPS
+SPRITE_CACHE_SIZE = 128
+SPRITE_COLORKEY = (255, 0, 255)  # transparent colour of baked opaque sprites
+SEGMENT_SPRITE_CACHE_SIZE = 512
+SEGMENT_ALPHA_STEP = 8  # dying fade alpha is rounded up to multiples of this
+
 # Particle constants
+MAX_PARTICLES = 4096
+PARTICLE_CIRCLE = 0
+PARTICLE_SQUARE = 1
+PARTICLE_TRIANGLE = 2
 PARTICLE_GLOW_BRIGHTNESS_MULTIPLIER = 0.5
 PARTICLE_SIZE_GLOW_OFFSET = 2
 
@@ -160,22 +192,100 @@ BIRD_HOVER_SPEED = 0.02
 BIRD_FONT_SIZE = 40
 BIRD_DIALOGUE_Y = 950  # Bottom of screen for dialogue box
 BIRD_DIALOGUE_HEIGHT = 90
+# Quotes whose wrapped lines stay rendered. Startup prerenders only the newest this many in the
+# background (buffered API quotes last, so they're kept); any older quote is rendered when the
+# bird picks it, about a millisecond, before its first frame on screen
+BIRD_DIALOGUE_CACHE_SIZE = 64
 BIRD_HEALTH_BAR_WIDTH = 100
 BIRD_HEALTH_BAR_HEIGHT = 10
 
 # UI constants
+FONT_PATH = 'assets/font.ttf'
+SCORE_FONT_SIZE = 48
+MENU_TITLE_FONT_SIZE = 192
+MENU_BUTTON_FONT_SIZE = 96
+TEXT_CACHE_SIZE = 256
 GAME_OVER_OVERLAY_ALPHA = 180
 GAME_OVER_FONT_SIZE = 192
 GAME_OVER_TEXT_Y_OFFSET = -130
 RESTART_FONT_SIZE = 96
 RESTART_TEXT_Y_OFFSET = 180
 
+# Dirty-rect rendering
+DIRTY_TILE_SIZE = 64  # changed areas are tracked on a grid of tiles this big
+DIRTY_FULL_FLIP_COVERAGE = 0.5  # flip the whole frame once this share of tiles changed
+
 # Input constants
 
+# Assets
+IMAGE_ASSETS = {  # name -> (path, has per-pixel alpha)
+    'background': ('assets/background.png', False),
+    'apple': ('assets/apple.png', True),
+    'bomb': ('assets/bomb.png', True),
+    'bird': ('assets/bird.png', True),
+    'bird2': ('assets/bird2.png', True),
+}
+SOUND_ASSETS = {
+    'bomb_sound': 'assets/bomb.wav',
+    'deadbird_sound': 'assets/deadbird.wav',
+    'eat_sound': 'assets/eat.mp3',
+    'hit_sound': 'assets/hit.wav',
+    'screech_sound': 'assets/screech.wav',
+    'click_sound': 'assets/click.wav',
+}
+MENU_ASSETS = ('background', 'click_sound')  # all the menu needs, the rest can finish loading behind it
+ASSET_WORKERS = 4
+ASSET_BUNDLE_PATH = 'assets/assets.bundle'
+ASSET_BUNDLE_MAGIC = b'SNAB'
+ASSET_BUNDLE_VERSION = 1
+
+# Replays
+REPLAY_MAGIC = b'SNRP'
+REPLAY_VERSION = 1
+KEYFRAME_INTERVAL = 300  # frames between state keyframes (5 seconds)
+
 # Level generation
 LEVEL_SPACING_MULTIPLIER = 3
 GROK_TEMPERATURE = 0.3
 
+# Quote generation
+QUOTE_EVENTS = ('appeared', 'damaged', 'dying', 'nibble')
+QUOTE_WORKERS = 2
+QUOTE_PREFETCH_DEPTH = {'appeared': 2, 'damaged': 3, 'dying': 2, 'nibble': 3}  # ready quotes kept per event
+QUOTE_PRIORITY_STOP = -1
+QUOTE_PRIORITY_URGENT = 0  # the bird is already waiting on this event
+QUOTE_PRIORITY_PREFETCH = 1
+QUOTE_BATCH_SIZE = 6  # most quotes asked for in one API call, 1 turns batching off
+QUOTE_BATCH_WINDOW = 0.05  # seconds a prefetch waits for more requests to share its call
+QUOTE_MAX_LENGTH = 160  # longer lines don't fit the dialogue box
+FALLBACK_QUOTE = "You're just a slimy worm!"
+QUOTE_STREAMING = True  # stream the quote the bird is waiting on into the dialogue box as it's generated
+QUOTE_LATENCY_SAMPLES = 100  # recent request timings kept per measure
+QUOTE_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)  # histogram bucket upper bounds, seconds
+QUOTE_CONNECT_TIMEOUT = 3.0  # seconds to open a connection to the API
+QUOTE_READ_TIMEOUT = 10.0  # seconds the API may go quiet mid-response
+QUOTE_HEDGE_PERCENTILE = 95  # send a second copy of a call that runs past this latency percentile
+QUOTE_HEDGE_MIN_SAMPLES = 20  # timings needed before hedging kicks in
+QUOTE_BREAKER_FAILURES = 3  # consecutive failed calls that open the circuit breaker
+QUOTE_BREAKER_COOLDOWN = 30.0  # seconds before an open breaker lets a probe call through
+
+# Quote store: a JSON snapshot plus an append-only log of quotes saved since
+QUOTES_PATH = 'quotes.json'
+QUOTE_LOG_PATH = 'quotes.log'
+QUOTE_LOG_FSYNC_INTERVAL = 1.0  # seconds between fsyncs of the log
+QUOTE_LOG_COMPACT_ENTRIES = 64  # fold the log into the snapshot once it holds this many quotes
+QUOTE_MODEL_PATH = 'quotes.model'
+QUOTE_MODEL_VERSION = 1  # bump when the compiled table layout changes
+QUOTE_MODEL_ORDER = 2  # words of context per step of the offline quote generator
+QUOTE_MODEL_MAX_WORDS = 40
+QUOTE_MODEL_ATTEMPTS = 8  # walks tried for a line that isn't already in the store
+QUOTE_INDEX_PATH = 'quotes.minhash'
+QUOTE_INDEX_VERSION = 2
+QUOTE_SHINGLE_WORDS = 2  # quotes are compared as sets of this many consecutive words
+QUOTE_MINHASH_PERMUTATIONS = 64
+QUOTE_LSH_BANDS = 32  # 2 rows per band, pairs past ~0.4 similarity nearly always share a bucket
+QUOTE_DUPLICATE_SIMILARITY = 0.4  # estimated Jaccard similarity that makes a quote a near-duplicate
+
 
 
 
@@ -189,9 +299,382 @@ def grid_to_pixel(grid_x, grid_y):
 def pixel_to_grid(px, py):
     return (px // GRID_SIZE, py // GRID_SIZE)
 
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+def make_rng(seed, stream):
+    # Independent random stream per subsystem, so cosmetic draws never shift gameplay spawns
+    return random.Random(f"{seed}:{stream}")
+
+class SpriteCache:
+    # Pre-scaled copies of the source images, keyed by (name, size) with LRU eviction
+    def __init__(self, max_entries=SPRITE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.images = {}
+        self.cache = OrderedDict()
+
+    def add(self, name, image):
+        self.images[name] = image
+
+    def sized(self, name, size):
+        key = (name, size)
+        surf = self.cache.get(key)
+        if surf is not None:
+            self.cache.move_to_end(key)
+            return surf
+        surf = pygame.transform.scale(self.images[name], size)
+        self.cache[key] = surf
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return surf
+
+    def scaled(self, name, scale):
+        # Returns None when the quantized scale rounds to nothing
+        step = round(scale * SPRITE_SCALE_STEPS) / SPRITE_SCALE_STEPS
+        image = self.images[name]
+        size = (int(image.get_width() * step), int(image.get_height() * step))
+        if size[0] <= 0 or size[1] <= 0:
+            return None
+        return self.sized(name, size)
+
+    def warm(self, names):
+        for name in names:
+            for step in range(1, SPRITE_SCALE_STEPS + 1):
+                self.scaled(name, step / SPRITE_SCALE_STEPS)
+
+class SegmentSpriteCache:
+    # Snake segment circles keyed by (colour, radius, alpha bucket), LRU evicted. Radii are
+    # already whole pixels; alpha is bucketed so the dying fade reuses a handful of sprites.
+    def __init__(self, max_entries=SEGMENT_SPRITE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+
+    def get(self, color, radius, alpha=255):
+        alpha = min(255, -(-alpha // SEGMENT_ALPHA_STEP) * SEGMENT_ALPHA_STEP)
+        key = (color, radius, alpha)
+        surf = self.cache.get(key)
+        if surf is not None:
+            self.cache.move_to_end(key)
+            return surf
+        display_ready = pygame.display.get_surface() is not None
+        if alpha < 255:
+            # Faded circles bake the alpha into the pixels, SDL has no fast path for
+            # colour key plus surface alpha
+            surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surf, (*color, alpha), (radius, radius), radius)
+            if display_ready:
+                surf = surf.convert_alpha()
+        else:
+            # Opaque circles blit fastest as RLE colour-keyed surfaces
+            surf = pygame.Surface((radius * 2, radius * 2))
+            surf.fill(SPRITE_COLORKEY)
+            pygame.draw.circle(surf, color, (radius, radius), radius)
+            if display_ready:
+                surf = surf.convert()
+            surf.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+        self.cache[key] = surf
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return surf
+
+class TextCache:
+    # One Font per size and rendered surfaces keyed by (text, size, colour), LRU evicted
+    def __init__(self, sizes=(), max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.rendered = OrderedDict()
+        for size in sizes:
+            self.font(size)
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(FONT_PATH, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, color)
+        surf = self.rendered.get(key)
+        if surf is not None:
+            self.rendered.move_to_end(key)
+            return surf
+        surf = self.font(size).render(text, True, color)
+        self.rendered[key] = surf
+        if len(self.rendered) > self.max_entries:
+            self.rendered.popitem(last=False)
+        return surf
+
+    def prerender(self, labels):
+        for text, size, color in labels:
+            self.render(text, size, color)
+
+class DialogueRenderer:
+    # Draws the dialogue box as one shared background plus the quote's wrapped lines. Only the
+    # lines are cached per quote, cropped and 8-bit, so a full cache stays a few MB
+    def __init__(self, font, max_entries=BIRD_DIALOGUE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.texts = OrderedDict()
+        self.lock = threading.Lock()
+        # The text cache's font, shared with the prerender thread. SDL_ttf fonts keep a glyph
+        # cache that isn't safe to touch from two threads at once, so renders take font_lock
+        self.font = font
+        self.font_lock = threading.Lock()
+        self.partial = (None, None)  # last half-streamed line, kept out of the cache
+        self.box = pygame.Surface((SCREEN_WIDTH, BIRD_DIALOGUE_HEIGHT), pygame.SRCALPHA)
+        box_rect = self.box.get_rect()
+        pygame.draw.rect(self.box, (0, 0, 0), box_rect, border_radius=15)  # Black background
+        pygame.draw.rect(self.box, WHITE, box_rect, 2, border_radius=15)  # White border
+
+    def build_text(self, text):
+        with self.font_lock:
+            return self.wrap_text(text, self.font)
+
+    def wrap_text(self, text, font):
+        # Returns the wrapped lines on black, cropped to their extent, and where they sit in the box
+        # Wrap text to fit within dialogue box
+        max_width = SCREEN_WIDTH - 100  # Padding
+        words = text.split(' ')
+        lines = []
+        current_line = ""
+        for word in words:
+            test_line = current_line + word + " "
+            if font.size(test_line)[0] <= max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    lines.append(current_line.strip())
+                current_line = word + " "
+        if current_line:
+            lines.append(current_line.strip())
+        # Render each line, shaded on black so they stay 8-bit
+        line_height = font.get_height()
+        line_spacing = line_height + 7  # Increase spacing
+        total_height = len(lines) * line_spacing - 3  # Adjust total height
+        start_y = (BIRD_DIALOGUE_HEIGHT - total_height) // 2
+        line_surfs = [font.render(line, True, WHITE) for line in lines]
+        line_rects = [line_surf.get_rect(center=(SCREEN_WIDTH // 2, start_y + i * line_spacing + line_height // 2))
+                      for i, line_surf in enumerate(line_surfs)]
+        bounds = line_rects[0].unionall(line_rects[1:]) if line_rects else pygame.Rect(0, 0, 0, 0)
+        # Kept inside the border: text over it would blend to the same white anyway, and this
+        # way the black behind the lines can be blitted plainly
+        bounds = bounds.clip(2, 2, SCREEN_WIDTH - 4, BIRD_DIALOGUE_HEIGHT - 4)
+        # Blend the lines onto black like a full panel would, then keep one grey channel
+        blended = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        blended.fill((0, 0, 0, 255))
+        for line_surf, line_rect in zip(line_surfs, line_rects):
+            blended.blit(line_surf, line_rect.move(-bounds.x, -bounds.y))
+        surf = pygame.Surface(bounds.size, 0, 8)
+        surf.set_palette([(i, i, i) for i in range(256)])  # white on black blends to greys
+        if bounds.width and bounds.height:
+            pygame.surfarray.pixels2d(surf)[:] = pygame.surfarray.pixels3d(blended)[:, :, 0]
+        return surf, bounds.topleft
+
+    def store(self, text, entry):
+        with self.lock:
+            self.texts[text] = entry
+            self.texts.move_to_end(text)
+            while len(self.texts) > self.max_entries:
+                self.texts.popitem(last=False)
+
+    def lines(self, text, partial=False):
+        if partial:
+            # A streaming quote grows every few frames, only its latest prefix is worth keeping
+            if self.partial[0] != text:
+                self.partial = (text, self.build_text(text))
+            return self.partial[1]
+        with self.lock:
+            entry = self.texts.get(text)
+            if entry is not None:
+                self.texts.move_to_end(text)
+                return entry
+        entry = self.build_text(text)
+        self.store(text, entry)
+        return entry
+
+    def draw(self, surf, text, partial=False, y=BIRD_DIALOGUE_Y):
+        # Returns the screen rect of the box
+        rect = surf.blit(self.box, (0, y))
+        text_surf, (x, text_y) = self.lines(text, partial)
+        surf.blit(text_surf, (x, y + text_y))
+        return rect
+
+    def prerender_async(self, texts):
+        # Only the newest max_entries texts are rendered, anything older would just be evicted again
+        texts = texts[-self.max_entries:] if self.max_entries else []
+        def work():
+            for text in texts:
+                with self.lock:
+                    if text in self.texts:
+                        continue
+                self.store(text, self.build_text(text))
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        return thread
+
+def make_np_rng(seed, stream):
+    # NumPy generator for batched draws, seeded from the same per-stream sequence
+    return np.random.default_rng(make_rng(seed, stream).getrandbits(64))
+
+class Button:
+    # Label on a rounded plate, pre-composited once in its normal and hover colours
+    def __init__(self, label, center, color, hover_color, border_color=WHITE):
+        label_rect = label.get_rect(center=center)
+        self.rect = pygame.Rect(label_rect.left - 50, label_rect.top - 25, label_rect.width + 100, label_rect.height + 50)
+        label_pos = (label_rect.left - self.rect.left, label_rect.top - self.rect.top)
+        self.images = {hover: self.build(label, label_pos, plate, border_color) for hover, plate in ((False, color), (True, hover_color))}
+
+    def build(self, label, label_pos, color, border_color):
+        plate = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        pygame.draw.rect(plate, color, plate.get_rect(), border_radius=15)
+        pygame.draw.rect(plate, border_color, plate.get_rect(), 4, border_radius=15)
+        plate.blit(label, label_pos)
+        if pygame.display.get_surface() is not None:
+            plate = plate.convert_alpha()
+        return plate
+
+    def hovered(self, pos):
+        return self.rect.collidepoint(pos)
+
+    def draw(self, surf, hover):
+        return surf.blit(self.images[hover], self.rect)
+
+class FullRenderer:
+    # Redraws the whole background and flips every frame
+    def restore(self, screen, background):
+        screen.blit(background, (0, 0))
+
+    def add(self, rect):
+        pass
+
+    def extend(self, rects):
+        pass
+
+    def add_points(self, xs, ys, pad):
+        pass
+
+    def invalidate(self):
+        pass
+
+    def present(self):
+        pygame.display.flip()
+
+class DirtyRectRenderer:
+    # Tracks what was drawn on a coarse tile grid. Each frame only the tiles drawn last frame
+    # are restored from the background, and only tiles drawn last frame or this frame are
+    # sent to the display. Falls back to a full flip when too much of the screen changed.
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, tile=DIRTY_TILE_SIZE):
+        self.tile = tile
+        self.screen_rect = pygame.Rect(0, 0, width, height)
+        self.rows = -(-height // tile)
+        self.cols = -(-width // tile)
+        self.previous = np.zeros((self.rows, self.cols), dtype=bool)
+        self.current = np.zeros((self.rows, self.cols), dtype=bool)
+        # Whole-screen frames: the previous one must be fully restored, the current one fully shown
+        self.previous_full = True
+        self.current_full = False
+        self.background = None
+
+    def restore(self, screen, background):
+        if background is not self.background:
+            # Switching backgrounds changes every pixel
+            self.background = background
+            self.previous_full = True
+        if self.previous_full or self.previous.mean() > DIRTY_FULL_FLIP_COVERAGE:
+            screen.blit(background, (0, 0))
+        else:
+            for rect in self.rects(self.previous):
+                screen.blit(background, rect, rect)
+
+    def add(self, rect):
+        rect = self.screen_rect.clip(rect)
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        t = self.tile
+        self.current[rect.top // t:(rect.bottom - 1) // t + 1, rect.left // t:(rect.right - 1) // t + 1] = True
+
+    def extend(self, rects):
+        for rect in rects:
+            self.add(rect)
+
+    def add_points(self, xs, ys, pad):
+        # Marks the squares of half-size pad around every point, vectorized for big batches
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        visible = (xs + pad >= 0) & (xs - pad < self.screen_rect.width) & (ys + pad >= 0) & (ys - pad < self.screen_rect.height)
+        xs = xs[visible]
+        ys = ys[visible]
+        if not len(xs):
+            return
+        t = self.tile
+        x0 = np.clip((xs - pad) // t, 0, self.cols - 1).astype(int)
+        x1 = np.clip((xs + pad) // t, 0, self.cols - 1).astype(int)
+        y0 = np.clip((ys - pad) // t, 0, self.rows - 1).astype(int)
+        y1 = np.clip((ys + pad) // t, 0, self.rows - 1).astype(int)
+        span = int(2 * pad // t) + 2
+        for dy in range(span):
+            ty = np.minimum(y0 + dy, y1)
+            for dx in range(span):
+                self.current[ty, np.minimum(x0 + dx, x1)] = True
+
+    def invalidate(self):
+        # Something covered the whole screen this frame
+        self.current_full = True
+
+    def rects(self, mask):
+        # One rect per horizontal run of marked tiles
+        t = self.tile
+        rects = []
+        for row in np.flatnonzero(mask.any(axis=1)):
+            padded = np.concatenate(([False], mask[row], [False]))
+            edges = np.flatnonzero(padded[1:] != padded[:-1])
+            for start, end in zip(edges[::2], edges[1::2]):
+                rects.append(self.screen_rect.clip(pygame.Rect(start * t, row * t, (end - start) * t, t)))
+        return rects
+
+    def present(self):
+        changed = self.previous | self.current
+        if self.previous_full or self.current_full or changed.mean() > DIRTY_FULL_FLIP_COVERAGE:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.rects(changed))
+        self.previous, self.current = self.current, self.previous
+        self.current[:] = False
+        self.previous_full = self.current_full
+        self.current_full = False
+
 class Snake:
-    def __init__(self, x, y):
-        self.segments = deque([{'x': x, 'y': y, 'scale': 1.0, 'vx': 0, 'vy': 0}])
+    # Segments live in preallocated struct-of-arrays storage, index 0 is the head and
+    # only the first self.length entries are alive. Body segments are placed along the
+    # trail the head has drawn, min_seg_dist apart, so following is one vectorized lookup.
+    def __init__(self, x, y, rng=None):
+        self.rng = rng or random.Random()
+        self.capacity = SNAKE_INITIAL_CAPACITY
+        self.seg_x = np.zeros(self.capacity)
+        self.seg_y = np.zeros(self.capacity)
+        self.seg_scale = np.zeros(self.capacity)
+        self.seg_vx = np.zeros(self.capacity)
+        self.seg_vy = np.zeros(self.capacity)
+        self.prev_x = np.zeros(self.capacity)
+        self.prev_y = np.zeros(self.capacity)
+        self.prev_count = 0
+        self.seg_x[0] = x
+        self.seg_y[0] = y
+        self.seg_scale[0] = 1.0
+        # Head trail, oldest first: positions and the head odometer reading at each point
+        self.trail_x = np.zeros(self.capacity)
+        self.trail_y = np.zeros(self.capacity)
+        self.trail_odo = np.zeros(self.capacity)
+        self.trail_x[0] = x
+        self.trail_y[0] = y
+        self.trail_start = 0
+        self.trail_end = 1
+        self.odometer = 0.0
+        # Broadphase over the trail: cell -> odometer readings of the trail points inside it,
+        # oldest first. Trail points never move, so cells only change at the two trail ends.
+        self.trail_cells = {self.trail_cell(x, y): deque([0.0])}
+        self.max_trail_step = 0.0
+        self.followed_length = 1
         self.radius = SNAKE_RADIUS
         self.length = 1
         self.last_direction = None
@@ -200,7 +683,7 @@ class Snake:
         self.vy = 0
         self.grow_rate = SNAKE_GROW_RATE  # animation rate
         self.min_seg_dist = SCROLL_SPEED
-        self.seg_speed = MOVE_SPEED * SNAKE_SEG_SPEED_MULTIPLIER
+        self.arc_offsets = np.arange(self.capacity) * self.min_seg_dist
         self.eye_time = 0  # for pupil animation
         self.target_facing_angle = 0
         self.current_facing_angle = 0
@@ -211,17 +694,25 @@ class Snake:
         self.eye_x = 0
         self.eye_y = 0
         self.dying_timer = 0
+        self.prev_eye_y = 0
         # Start with 5 segments
         for i in range(4):
             self.grow()
 
-    def move(self, dx, dy):
-        head_seg = self.segments[0]
-        head_x, head_y = head_seg['x'], head_seg['y']
+    @property
+    def head_x(self):
+        return float(self.seg_x[0])
+
+    @property
+    def head_y(self):
+        return float(self.seg_y[0])
+
+    def move(self, dx, dy, camera_x=0.0):
+        # Segments are in world space, steering and screen-edge limits work on screen positions
+        head_x, head_y = self.head_x - camera_x, self.head_y
         # Reset last_direction if movement is idle/slow
-        if len(self.segments) > 1:
-            prev_seg = self.segments[1]
-            prev_x, prev_y = prev_seg['x'], prev_seg['y']
+        if self.length > 1:
+            prev_x, prev_y = float(self.seg_x[1]) - camera_x, float(self.seg_y[1])
             dist_last = math.hypot(head_x - prev_x, head_y - prev_y)
             if dist_last < SNAKE_IDLE_DIST_THRESHOLD:
                 self.last_direction = None
@@ -309,70 +800,229 @@ class Snake:
         # Smooth eye positioning
         self.current_facing_angle += (self.target_facing_angle - self.current_facing_angle) * self.eye_lerp_factor
         
-        self.segments[0] = {'x': new_x, 'y': new_y, 'scale': self.segments[0]['scale']}
-
-        # Move segments towards the one in front
-        for i in range(1, len(self.segments)):
-            target_x, target_y = self.segments[i-1]['x'], self.segments[i-1]['y']
-            curr_x, curr_y = self.segments[i]['x'], self.segments[i]['y']
-            dx = target_x - curr_x
-            dy = target_y - curr_y
-            dist = math.hypot(dx, dy)
-            if dist > self.min_seg_dist:
-                move_dist = min(self.seg_speed, dist - self.min_seg_dist)
-                curr_x += (dx / dist) * move_dist
-                curr_y += (dy / dist) * move_dist
-                self.segments[i]['x'] = curr_x
-                self.segments[i]['y'] = curr_y
+        self.seg_x[0] = new_x + camera_x
+        self.seg_y[0] = new_y
+        self.push_trail(new_x + camera_x, new_y)
+        self.follow()
 
         if update_direction and (input_dx != 0 or input_dy != 0):
             self.last_direction = (input_dx, input_dy)
         self.eye_time += 1  # increment for pupil animation
 
-    def shift_world_scroll(self, amount):
-        for seg in self.segments:
-            seg['x'] -= amount
+    def push_trail(self, x, y):
+        last = self.trail_end - 1
+        step = math.hypot(x - self.trail_x[last], y - self.trail_y[last])
+        if step == 0:
+            return
+        if self.trail_end == len(self.trail_x):
+            self.compact_trail()
+        self.odometer += step
+        self.trail_x[self.trail_end] = x
+        self.trail_y[self.trail_end] = y
+        self.trail_odo[self.trail_end] = self.odometer
+        self.trail_end += 1
+        self.trail_cells.setdefault(self.trail_cell(x, y), deque()).append(self.odometer)
+        self.max_trail_step = max(self.max_trail_step, step)
+
+    @staticmethod
+    def trail_cell(x, y):
+        return (int(x // SELF_COLLISION_CELL_SIZE), int(y // SELF_COLLISION_CELL_SIZE))
+
+    def compact_trail(self):
+        # Slide the live window back to the front, doubling the buffer if it is mostly live
+        live = self.trail_end - self.trail_start
+        if live * 2 > len(self.trail_x):
+            size = len(self.trail_x) * 2
+            for name in ('trail_x', 'trail_y', 'trail_odo'):
+                old = getattr(self, name)
+                new = np.zeros(size)
+                new[:live] = old[self.trail_start:self.trail_end]
+                setattr(self, name, new)
+        else:
+            for arr in (self.trail_x, self.trail_y, self.trail_odo):
+                arr[:live] = arr[self.trail_start:self.trail_end]
+        self.trail_start = 0
+        self.trail_end = live
+
+    def follow(self):
+        # Vectorized follow kernel: sample the trail at min_seg_dist steps behind the head,
+        # then drop trail points the tail no longer needs
+        n = self.length
+        self.followed_length = n
+        start, end = self.trail_start, self.trail_end
+        odo = self.trail_odo[start:end]
+        if n > 1:
+            targets = self.odometer - self.arc_offsets[1:n]
+            self.seg_x[1:n] = np.interp(targets, odo, self.trail_x[start:end])
+            self.seg_y[1:n] = np.interp(targets, odo, self.trail_y[start:end])
+        oldest_needed = self.odometer - self.arc_offsets[n - 1]
+        keep_from = int(np.searchsorted(odo, oldest_needed, side='right')) - 1
+        if keep_from > 0:
+            # Dropped points are the oldest entry of their cell
+            for k in range(start, start + keep_from):
+                key = self.trail_cell(self.trail_x[k], self.trail_y[k])
+                cell = self.trail_cells[key]
+                cell.popleft()
+                if not cell:
+                    del self.trail_cells[key]
+            self.trail_start += keep_from
+
+    def hits_body(self, first_index=SELF_COLLISION_MIN_SEGMENT):
+        # Exact head test against every segment from first_index on. Segment i sits on the trail
+        # at odometer - i * min_seg_dist, so trail points near the head map to short index ranges.
+        n = self.length
+        if n <= first_index:
+            return False
+        head_x, head_y = self.head_x, self.head_y
+        limit = self.radius * 2
+        reach = limit + self.max_trail_step
+        spacing = self.min_seg_dist
+        newest = self.odometer - first_index * spacing
+        near = []
+        for cy in range(int((head_y - reach) // SELF_COLLISION_CELL_SIZE), int((head_y + reach) // SELF_COLLISION_CELL_SIZE) + 1):
+            for cx in range(int((head_x - reach) // SELF_COLLISION_CELL_SIZE), int((head_x + reach) // SELF_COLLISION_CELL_SIZE) + 1):
+                for odo in self.trail_cells.get((cx, cy), ()):
+                    if odo > newest:
+                        break
+                    near.append(odo)
+        candidates = []
+        if near:
+            # Segments on the trail edge that starts at each nearby point
+            near = np.array(near)
+            hi = np.minimum((self.odometer - near) / spacing + 1, n - 1).astype(int)
+            lo = np.maximum((self.odometer - near - self.max_trail_step) / spacing, first_index).astype(int)
+            idx = lo[:, None] + np.arange(int(self.max_trail_step / spacing) + 3)
+            candidates.append(idx[idx <= hi[:, None]])
+        # Segments past the start of the trail are parked on its first point. That point can be
+        # newer than the newest one gathered above when the trail is shorter than first_index
+        # segments, so the parked range is always tested
+        parked = max(first_index, int((self.odometer - self.trail_odo[self.trail_start]) / spacing))
+        if parked < n:
+            candidates.append(np.arange(parked, n))
+        if n > self.followed_length:
+            # Segments grown since the last follow still sit on the old tail
+            candidates.append(np.arange(max(first_index, self.followed_length), n))
+        if not candidates:
+            return False
+        idx = np.concatenate(candidates)
+        dx = self.seg_x[idx] - head_x
+        dy = self.seg_y[idx] - head_y
+        return bool(np.any(dx * dx + dy * dy < limit * limit))
+
+    def grow_scales(self):
+        # Scale-grow kernel for freshly added segments
+        scales = self.seg_scale[:self.length]
+        np.minimum(scales + self.grow_rate, 1.0, out=scales)
+
+    def update_dying(self):
+        # Dying kernel: segments fly apart and slow down, eyes drop
+        n = self.length
+        self.seg_x[:n] += self.seg_vx[:n]
+        self.seg_y[:n] += self.seg_vy[:n]
+        self.seg_vx[:n] *= 0.98
+        self.seg_vy[:n] *= 0.98
+        self.eye_y += self.eye_fall_speed
+        self.dying_timer += 1
+
+    def store_previous(self):
+        n = self.length
+        self.prev_x[:n] = self.seg_x[:n]
+        self.prev_y[:n] = self.seg_y[:n]
+        self.prev_count = n
+        self.prev_eye_y = self.eye_y
+
+    def render_positions(self, interp):
+        # Segment positions blended with the previous sim step, segments born since then aren't blended
+        n = self.length
+        xs = self.seg_x[:n].copy()
+        ys = self.seg_y[:n].copy()
+        m = min(n, self.prev_count)
+        if m and interp < 1.0:
+            xs[:m] = self.prev_x[:m] + (xs[:m] - self.prev_x[:m]) * interp
+            ys[:m] = self.prev_y[:m] + (ys[:m] - self.prev_y[:m]) * interp
+        return xs, ys
+
+    def ensure_capacity(self, count):
+        if count <= self.capacity:
+            return
+        size = self.capacity
+        while size < count:
+            size *= 2
+        for name in ('seg_x', 'seg_y', 'seg_scale', 'seg_vx', 'seg_vy', 'prev_x', 'prev_y'):
+            old = getattr(self, name)
+            new = np.zeros(size)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.arc_offsets = np.arange(size) * self.min_seg_dist
+        self.capacity = size
 
     def grow(self):
-        tail = self.segments[-1]
-        self.segments.append({'x': tail['x'], 'y': tail['y'], 'scale': 0.0, 'vx': 0, 'vy': 0})
+        self.ensure_capacity(self.length + 1)
+        tail = self.length - 1
+        self.seg_x[self.length] = self.seg_x[tail]
+        self.seg_y[self.length] = self.seg_y[tail]
+        self.seg_scale[self.length] = 0.0
+        self.seg_vx[self.length] = 0.0
+        self.seg_vy[self.length] = 0.0
         self.length += 1
 
+    def truncate(self, count):
+        # O(1): segments past the new length are simply no longer alive
+        self.length = max(1, min(self.length, count))
+
     def shrink(self, percentage):
         reduction = max(1, int(self.length * percentage))
-        self.length = max(1, self.length - reduction)
-        self.segments = deque(list(self.segments)[:self.length])
+        self.truncate(self.length - reduction)
 
     def start_dying(self):
         self.dying = True
-        for seg in self.segments:
-            seg['vx'] = random.uniform(-10, 10)
-            seg['vy'] = random.uniform(-10, 10)
-        self.eye_x = self.segments[0]['x']
-        self.eye_y = self.segments[0]['y']
+        n = self.length
+        velocities = [self.rng.uniform(-10, 10) for _ in range(n * 2)]
+        self.seg_vx[:n] = velocities[0::2]
+        self.seg_vy[:n] = velocities[1::2]
+        self.eye_x = self.head_x
+        self.eye_y = self.head_y
+        self.prev_eye_y = self.eye_y
         self.dying_timer = 0
 
-    def draw(self, surf):
-        segments_list = list(self.segments)
-
-        for i, seg in enumerate(segments_list):
-            scale = seg['scale']
-            radius = int(self.radius * scale)
-            if radius > 0:
-                color = RED if self.red_tint_timer > 0 else (DARK_GREEN if i == 0 or i == len(segments_list) - 1 else GREEN)
-                if self.dying:
-                    alpha = max(0, 255 - self.dying_timer * 3)
-                    if alpha > 0:
-                        temp_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-                        pygame.draw.circle(temp_surf, (*color, alpha), (radius, radius), radius)
-                        surf.blit(temp_surf, (int(seg['x'] - radius), int(seg['y'] - radius)))
-                else:
-                    pygame.draw.circle(surf, color, (int(seg['x']), int(seg['y'])), radius)
+    def draw(self, surf, sprites, interp=1.0, camera_x=0.0, renderer=None):
+        # Every segment is a cached circle sprite, all drawn with one blits call
+        n = self.length
+        xs, ys = self.render_positions(interp)
+        xs -= camera_x
+        if renderer:
+            renderer.add_points(xs, ys, self.radius + 1)
+        radii = (self.radius * self.seg_scale[:n]).astype(int)
+        lefts = xs.astype(int) - radii
+        tops = ys.astype(int) - radii
+
+        alpha = max(0, 255 - self.dying_timer * 3) if self.dying else 255
+        if alpha > 0:
+            body_color = RED if self.red_tint_timer > 0 else GREEN
+            end_color = RED if self.red_tint_timer > 0 else DARK_GREEN
+            # Long bodies trail far off screen, only visible segments are blitted
+            width, height = surf.get_size()
+            visible = np.flatnonzero((radii > 0) & (lefts < width) & (lefts + 2 * radii > 0) &
+                                     (tops < height) & (tops + 2 * radii > 0))
+            frame_sprites = {}
+            blits = []
+            for i, radius, left, top in zip(visible.tolist(), radii[visible].tolist(), lefts[visible].tolist(), tops[visible].tolist()):
+                color = end_color if i == 0 or i == n - 1 else body_color
+                sprite = frame_sprites.get((color, radius))
+                if sprite is None:
+                    sprite = frame_sprites[(color, radius)] = sprites.get(color, radius, alpha)
+                blits.append((sprite, (left, top)))
+            surf.blits(blits, doreturn=False)
+
+        xs = xs.tolist()
+        ys = ys.tolist()
 
         # Draw eyes on top, always visible
-        if len(segments_list) > 0:
-            head_seg = segments_list[0]
-            head_x, head_y = head_seg['x'], head_seg['y']
+        eye_rects = []
+        if n > 0:
+            head_x, head_y = xs[0], ys[0]
+            eye_x = self.eye_x - camera_x
+            eye_y = lerp(self.prev_eye_y, self.eye_y, interp)
             eye_radius = EYE_RADIUS  # slightly smaller eyes
             pupil_radius = PUPIL_RADIUS
             eye_offset_forward = EYE_OFFSET_FORWARD  # reduced offset to slightly overlap head
@@ -380,10 +1030,10 @@ class Snake:
 
             if self.dying:
                 # Eyes fall straight down from initial position, no fading
-                pygame.draw.circle(surf, WHITE, (int(self.eye_x - 10), int(self.eye_y)), eye_radius)
-                pygame.draw.circle(surf, WHITE, (int(self.eye_x + 10), int(self.eye_y)), eye_radius)
-                pygame.draw.circle(surf, BLACK, (int(self.eye_x - 10), int(self.eye_y)), pupil_radius)
-                pygame.draw.circle(surf, BLACK, (int(self.eye_x + 10), int(self.eye_y)), pupil_radius)
+                eye_rects.append(pygame.draw.circle(surf, WHITE, (int(eye_x - 10), int(eye_y)), eye_radius))
+                eye_rects.append(pygame.draw.circle(surf, WHITE, (int(eye_x + 10), int(eye_y)), eye_radius))
+                pygame.draw.circle(surf, BLACK, (int(eye_x - 10), int(eye_y)), pupil_radius)
+                pygame.draw.circle(surf, BLACK, (int(eye_x + 10), int(eye_y)), pupil_radius)
             else:
                 left_eye_x = head_x + math.cos(self.current_facing_angle) * eye_offset_forward - math.sin(self.current_facing_angle) * eye_offset_side
                 left_eye_y = head_y + math.sin(self.current_facing_angle) * eye_offset_forward + math.cos(self.current_facing_angle) * eye_offset_side
@@ -391,13 +1041,16 @@ class Snake:
                 right_eye_x = head_x + math.cos(self.current_facing_angle) * eye_offset_forward + math.sin(self.current_facing_angle) * eye_offset_side
                 right_eye_y = head_y + math.sin(self.current_facing_angle) * eye_offset_forward - math.cos(self.current_facing_angle) * eye_offset_side
 
-                pygame.draw.circle(surf, WHITE, (int(left_eye_x), int(left_eye_y)), eye_radius)
-                pygame.draw.circle(surf, WHITE, (int(right_eye_x), int(right_eye_y)), eye_radius)
+                eye_rects.append(pygame.draw.circle(surf, WHITE, (int(left_eye_x), int(left_eye_y)), eye_radius))
+                eye_rects.append(pygame.draw.circle(surf, WHITE, (int(right_eye_x), int(right_eye_y)), eye_radius))
                 # Moving pupils
                 pupil_offset_x = math.sin(self.eye_time * PUPIL_OFFSET_X_FACTOR) * PUPIL_OFFSET_X_AMPLITUDE
                 pupil_offset_y = math.cos(self.eye_time * PUPIL_OFFSET_Y_FACTOR) * PUPIL_OFFSET_Y_AMPLITUDE
                 pygame.draw.circle(surf, BLACK, (int(left_eye_x + pupil_offset_x), int(left_eye_y + pupil_offset_y)), pupil_radius)
                 pygame.draw.circle(surf, BLACK, (int(right_eye_x + pupil_offset_x), int(right_eye_y + pupil_offset_y)), pupil_radius)
+        if renderer:
+            # Pupils stay inside the eye whites
+            renderer.extend(eye_rects)
 
 class Food:
     def __init__(self, grid_x, grid_y, pixel_x_offset):
@@ -410,22 +1063,19 @@ class Food:
         self.scale = 0.0
         self.radius = FOOD_RADIUS
 
-    def shift_left(self, amt):
-        self.pixel_x_offset -= amt
-        self.x = grid_to_pixel(self.grid_x, self.grid_y)[0] + self.pixel_x_offset
-    
     def update(self):
         if self.scale < 1.0:
             self.scale = min(1.0, self.scale + FOOD_SCALE_INCREMENT)
 
-    def draw(self, surf, image):
-        scaled_image = pygame.transform.scale(image, (int(image.get_width() * self.scale), int(image.get_height() * self.scale)))
-        rect = scaled_image.get_rect(center=(int(self.x), int(self.y)))
-        surf.blit(scaled_image, rect)
+    def sprite(self, sprites, name, camera_x=0.0):
+        # (surface, rect) for a batched blit, None while the sprite is too small to see
+        scaled_image = sprites.scaled(name, self.scale)
+        if scaled_image is None:
+            return None
+        return scaled_image, scaled_image.get_rect(center=(int(self.x - camera_x), int(self.y)))
 
     def check_collision(self, snake):
-        head = snake.segments[0]
-        head_x, head_y = head['x'], head['y']
+        head_x, head_y = snake.head_x, snake.head_y
         dist = math.hypot(head_x - self.x, head_y - self.y)
         return dist < self.radius * self.scale + snake.radius + BOMB_COLLISION_MARGIN
 
@@ -441,24 +1091,20 @@ class BombApple:
         self.radius = BOMB_RADIUS
         self.pulse = 0
 
-    def shift_left(self, amt):
-        self.pixel_x_offset -= amt
-        self.x = grid_to_pixel(self.grid_x, self.grid_y)[0] + self.pixel_x_offset
-    
     def update(self):
         if self.scale < 1.0:
             self.scale = min(1.0, self.scale + BOMB_SCALE_INCREMENT)
         self.pulse += BOMB_PULSE_INCREMENT
 
-    def draw(self, surf, image):
-        scaled_image = pygame.transform.scale(image, (int(image.get_width() * self.scale), int(image.get_height() * self.scale)))
-        rect = scaled_image.get_rect(center=(int(self.x), int(self.y)))
-        surf.blit(scaled_image, rect)
-        self.pulse += BOMB_PULSE_INCREMENT
+    def sprite(self, sprites, name, camera_x=0.0):
+        # (surface, rect) for a batched blit, None while the sprite is too small to see
+        scaled_image = sprites.scaled(name, self.scale)
+        if scaled_image is None:
+            return None
+        return scaled_image, scaled_image.get_rect(center=(int(self.x - camera_x), int(self.y)))
 
     def check_collision(self, snake):
-        head = snake.segments[0]
-        head_x, head_y = head['x'], head['y']
+        head_x, head_y = snake.head_x, snake.head_y
         dist = math.hypot(head_x - self.x, head_y - self.y)
         return dist < self.radius * self.scale + snake.radius
 
@@ -468,14 +1114,13 @@ class Bomb:
         self.y = y
         self.vx = vx
         self.vy = vy
+        self.prev_x = x
+        self.prev_y = y
         self.timer = 0
         self.max_timer = 3 * FPS
         self.active = True
         self.radius = BOMB_RADIUS
 
-    def shift_left(self, amt):
-        self.x -= amt
-
     def update(self):
         self.x += self.vx
         self.y += self.vy
@@ -483,63 +1128,107 @@ class Bomb:
         if self.timer >= self.max_timer:
             self.active = False
 
-    def check_explode(self, obstacles):
-        for obs in obstacles:
-            positions = obs.get_pixel_positions()
-            for px, py in positions:
-                if (px - GRID_SIZE//2 - BOMB_COLLISION_MARGIN <= self.x <= px + GRID_SIZE//2 + BOMB_COLLISION_MARGIN and
-                    py - GRID_SIZE//2 - BOMB_COLLISION_MARGIN <= self.y <= py + GRID_SIZE//2 + BOMB_COLLISION_MARGIN):
-                    return True
-        return False
-
-    def draw(self, surf, image):
-        rect = image.get_rect(center=(int(self.x), int(self.y)))
-        surf.blit(image, rect)
+    def check_explode(self, obstacle_grid):
+        return obstacle_grid.obstacle_at(self.x, self.y, BOMB_COLLISION_MARGIN) is not None
+
+    def sprite(self, image, interp=1.0, camera_x=0.0):
+        return image, image.get_rect(center=(int(lerp(self.prev_x, self.x, interp) - camera_x), int(lerp(self.prev_y, self.y, interp))))
 
 class GridObstacle:
-    def __init__(self, grid_positions, pixel_x_offset):
+    def __init__(self, grid_positions, pixel_x_offset, rng=None):
         self.grid_positions = grid_positions
         self.pixel_x_offset = pixel_x_offset
-        self.color = random.choice([GRAY, ORANGE, PURPLE])
-        
-    def shift_left(self, amt):
-        self.pixel_x_offset -= amt
+        self.color = (rng or random).choice([GRAY, ORANGE, PURPLE])
+        # Obstacles never move in world space, so tile positions and the center are computed once
+        self.positions = [(grid_to_pixel(gx, gy)[0] + pixel_x_offset, grid_to_pixel(gx, gy)[1]) for gx, gy in grid_positions]
+        if self.positions:
+            self.center = (sum(p[0] for p in self.positions) / len(self.positions),
+                           sum(p[1] for p in self.positions) / len(self.positions))
+        else:
+            self.center = (0, 0)
         
     def update(self):
         pass
         
     def get_pixel_positions(self):
-        positions = []
-        for gx, gy in self.grid_positions:
-            px, py = grid_to_pixel(gx, gy)
-            positions.append((px + self.pixel_x_offset, py))
-        return positions
+        return self.positions
         
-    def draw(self, surf):
+    def draw(self, surf, camera_x=0.0):
+        # Returns the screen rect covering every tile
         positions = self.get_pixel_positions()
+        rects = []
         for px, py in positions:
+            px -= camera_x
             rect = pygame.Rect(px - GRID_SIZE//2, py - GRID_SIZE//2, GRID_SIZE, GRID_SIZE)
             pygame.draw.rect(surf, self.color, rect)
             pygame.draw.rect(surf, WHITE, rect, OBSTACLE_RECT_BORDER)
+            rects.append(rect)
+        return rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0)
             
-    def check_collision(self, snake):
-        head = snake.segments[0]
-        head_x, head_y = head['x'], head['y']
-        positions = self.get_pixel_positions()
-
-        for px, py in positions:
-            if (px - GRID_SIZE//2 <= head_x <= px + GRID_SIZE//2 and
-                py - GRID_SIZE//2 <= head_y <= py + GRID_SIZE//2):
-                return True
-        return False
-    
     def get_center(self):
-        positions = self.get_pixel_positions()
-        if not positions:
-            return (0, 0)
-        avg_x = sum(p[0] for p in positions) / len(positions)
-        avg_y = sum(p[1] for p in positions) / len(positions)
-        return (avg_x, avg_y)
+        return self.center
+
+class ObstacleGrid:
+    # Spatial hash of obstacle tiles on the GRID_SIZE lattice. Tiles sit at arbitrary world x
+    # offsets, so one tile may cover two cells horizontally.
+    def __init__(self):
+        self.cells = {}
+
+    @staticmethod
+    def cell_range(lo, hi):
+        return range(int(lo // GRID_SIZE), int(hi // GRID_SIZE) + 1)
+
+    def insert(self, obstacle):
+        half = GRID_SIZE // 2
+        for px, py in obstacle.get_pixel_positions():
+            tile = (px, py, obstacle)
+            for cy in self.cell_range(py - half, py + half):
+                for cx in self.cell_range(px - half, px + half):
+                    self.cells.setdefault((cx, cy), []).append(tile)
+
+    def remove(self, obstacle):
+        half = GRID_SIZE // 2
+        for px, py in obstacle.get_pixel_positions():
+            for cy in self.cell_range(py - half, py + half):
+                for cx in self.cell_range(px - half, px + half):
+                    cell = self.cells.get((cx, cy))
+                    if cell is None:
+                        continue
+                    cell[:] = [tile for tile in cell if tile[2] is not obstacle]
+                    if not cell:
+                        del self.cells[(cx, cy)]
+
+    def tiles_in_rect(self, x0, y0, x1, y1):
+        # Tiles whose square overlaps the rectangle (edges inclusive), each reported once
+        half = GRID_SIZE // 2
+        found = []
+        seen = set()
+        for cy in self.cell_range(y0, y1):
+            for cx in self.cell_range(x0, x1):
+                for tile in self.cells.get((cx, cy), ()):
+                    px, py = tile[0], tile[1]
+                    if (px - half <= x1 and x0 <= px + half and py - half <= y1 and y0 <= py + half
+                            and id(tile) not in seen):
+                        seen.add(id(tile))
+                        found.append(tile)
+        return found
+
+    def obstacle_at(self, x, y, margin=0):
+        # First obstacle with a tile containing the point, tiles grown by margin on every side
+        tiles = self.tiles_in_rect(x - margin, y - margin, x + margin, y + margin)
+        return tiles[0][2] if tiles else None
+
+    def obstacles_in_radius(self, x, y, radius):
+        # Obstacles whose center lies within radius. A center is inside its own tiles' bounding
+        # box, so every match has a tile overlapping the query square.
+        found = []
+        for _, _, obstacle in self.tiles_in_rect(x - radius, y - radius, x + radius, y + radius):
+            if obstacle in found:
+                continue
+            ox, oy = obstacle.get_center()
+            if math.hypot(x - ox, y - oy) < radius:
+                found.append(obstacle)
+        return found
 
 class Explosion:
     def __init__(self, x, y):
@@ -549,16 +1238,65 @@ class Explosion:
         self.duration = EXPLOSION_DURATION
         self.timer = 0
 
-    def shift_left(self, amt):
-        self.x -= amt
-
     def update(self):
         self.timer += 1
         return self.timer < self.duration
 
-    def draw(self, surf):
-        progress = self.timer / self.duration
-        current_radius = int(self.radius * (EXPLOSION_CORE_START_FACTOR + progress * EXPLOSION_CORE_END_FACTOR))
+    def draw(self, surf, atlas, camera_x=0.0):
+        # One blit of the pre-baked frame, returns the screen rect it covered
+        image = atlas.frame(self.timer)
+        rect = image.get_rect(center=(int(self.x - camera_x), int(self.y)))
+        surf.blit(image, rect)
+        return rect
+
+class ExplosionAtlas:
+    # Every frame of the explosion animation baked once. The animation only depends on
+    # timer / EXPLOSION_DURATION, so frames are rebuilt only when the constants they were
+    # drawn from change. Frames are opaque rings on a colour key with RLE acceleration,
+    # which skips the empty ring interiors far faster than per-pixel alpha blending.
+    def __init__(self):
+        self.key = None
+        self.frames = []
+
+    @staticmethod
+    def params():
+        return (EXPLOSION_RADIUS, EXPLOSION_DURATION, EXPLOSION_COLOR, EXPLOSION_CORE_START_FACTOR,
+                EXPLOSION_CORE_END_FACTOR, EXPLOSION_INNER_FADE_START, EXPLOSION_INNER_RADIUS_FACTOR,
+                EXPLOSION_INNER_FACTOR_MULTIPLIER, EXPLOSION_RING_COUNT, EXPLOSION_RING_RADIUS_DECREMENT,
+                EXPLOSION_RING_PROGRESS_OFFSET, EXPLOSION_RING_THICKNESS_BASE, EXPLOSION_RING_THICKNESS_DECREMENT)
+
+    def ensure(self):
+        key = self.params()
+        if key != self.key:
+            self.build()
+            self.key = key
+
+    def frame(self, timer):
+        self.ensure()
+        return self.frames[max(0, min(timer, len(self.frames) - 1))]
+
+    @staticmethod
+    def frame_radius(progress):
+        return int(EXPLOSION_RADIUS * (EXPLOSION_CORE_START_FACTOR + progress * EXPLOSION_CORE_END_FACTOR))
+
+    def build(self):
+        # Frames grow with the blast, so each one is only as big as its outer ring
+        frames = []
+        for t in range(max(1, EXPLOSION_DURATION)):
+            progress = t / max(1, EXPLOSION_DURATION)
+            size = 2 * self.frame_radius(progress) + 2
+            frame = pygame.Surface((size, size))
+            frame.fill(SPRITE_COLORKEY)
+            self.draw_frame(frame, (size // 2, size // 2), progress)
+            if pygame.display.get_surface() is not None:
+                frame = frame.convert()
+            frame.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+            frames.append(frame)
+        self.frames = frames
+
+    @classmethod
+    def draw_frame(cls, surf, center, progress):
+        current_radius = cls.frame_radius(progress)
 
         # Inner bright core that fades quickly
         if progress < EXPLOSION_INNER_FADE_START:
@@ -567,7 +1305,7 @@ class Explosion:
             inner_color = (min(255, int(EXPLOSION_COLOR[0] * inner_factor * EXPLOSION_INNER_FACTOR_MULTIPLIER + 255 * (1 - inner_factor))),
                           min(255, int(EXPLOSION_COLOR[1] * inner_factor * EXPLOSION_INNER_FACTOR_MULTIPLIER + 255 * (1 - inner_factor))),
                           min(255, int(EXPLOSION_COLOR[2] * inner_factor * EXPLOSION_INNER_FACTOR_MULTIPLIER + 0 * (1 - inner_factor))))
-            pygame.draw.circle(surf, inner_color, (int(self.x), int(self.y)), inner_r)
+            pygame.draw.circle(surf, inner_color, center, inner_r)
 
         # Gradient-like rings with varying thickness and color
         for i in range(EXPLOSION_RING_COUNT):
@@ -581,60 +1319,145 @@ class Explosion:
                               int(EXPLOSION_COLOR[1] * factor + 255 * (1 - factor)),
                               int(EXPLOSION_COLOR[2] * factor + 0 * (1 - factor)))
                 thickness = max(1, EXPLOSION_RING_THICKNESS_BASE - i * EXPLOSION_RING_THICKNESS_DECREMENT)  # Thinner outer rings
-                pygame.draw.circle(surf, faded_color, (int(self.x), int(self.y)), r, thickness)
-
-class Particle:
-    def __init__(self, x, y, vx, vy, color, lifetime, size=5, shape='circle'):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.color = color
-        self.lifetime = lifetime
-        self.timer = 0
-        self.size = size
-        self.shape = shape
-        self.original_color = color
-
-    def shift_left(self, amt):
-        self.x -= amt
+                pygame.draw.circle(surf, faded_color, center, r, thickness)
+
+class ParticleSystem:
+    # Fixed-capacity particle pool stored as parallel arrays, only the first self.count are alive
+    FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'age', 'lifetime', 'size', 'shape')
+
+    def __init__(self, capacity=MAX_PARTICLES, rng=None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.ones(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.shape = np.zeros(capacity, dtype=np.int8)
+        self.color = np.zeros((capacity, 3))
+
+    def __len__(self):
+        return self.count
+
+    def __getstate__(self):
+        # Keyframes only carry the live particles
+        state = self.__dict__.copy()
+        for name in self.FIELDS + ('color',):
+            state[name] = getattr(self, name)[:self.count].copy()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in self.FIELDS + ('color',):
+            live = getattr(self, name)
+            full = np.zeros((self.capacity,) + live.shape[1:], dtype=live.dtype)
+            full[:self.count] = live
+            setattr(self, name, full)
+
+    def emit(self, xs, ys, count, vx_range, vy_range, color, lifetime, size, shape):
+        # Emits count particles at every (x, y) pair, dropping whatever doesn't fit the pool
+        origins_x = np.repeat(np.atleast_1d(np.asarray(xs, dtype=float)), count)
+        origins_y = np.repeat(np.atleast_1d(np.asarray(ys, dtype=float)), count)
+        n = min(len(origins_x), self.capacity - self.count)
+        if n <= 0:
+            return
+        a, b = self.count, self.count + n
+        self.x[a:b] = origins_x[:n]
+        self.y[a:b] = origins_y[:n]
+        self.prev_x[a:b] = origins_x[:n]
+        self.prev_y[a:b] = origins_y[:n]
+        self.vx[a:b] = self.rng.uniform(vx_range[0], vx_range[1], n)
+        self.vy[a:b] = self.rng.uniform(vy_range[0], vy_range[1], n)
+        self.age[a:b] = 0
+        self.lifetime[a:b] = lifetime
+        self.size[a:b] = size
+        self.shape[a:b] = shape
+        self.color[a:b] = color
+        self.count = b
+
+    def store_previous(self):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
 
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.timer += 1
-        return self.timer < self.lifetime
-
-    def draw(self, surf):
-        if self.timer < self.lifetime:
-            brightness = max(0, 1 - self.timer / self.lifetime)
-            r, g, b = self.original_color
-            faded_color = (int(r * brightness + 255 * (1 - brightness)), int(g * brightness + 255 * (1 - brightness)), int(b * brightness + 255 * (1 - brightness)))
-            size = self.size
-            if self.shape == 'circle':
-                pygame.draw.circle(surf, faded_color, (int(self.x), int(self.y)), size)
-            elif self.shape == 'square':
-                pygame.draw.rect(surf, faded_color, (int(self.x - size), int(self.y - size), size * 2, size * 2))
-            elif self.shape == 'triangle':
-                # Draw a triangle pointing up
-                points = [
-                    (int(self.x), int(self.y - size)),
-                    (int(self.x - size), int(self.y + size)),
-                    (int(self.x + size), int(self.y + size))
-                ]
-                pygame.draw.polygon(surf, faded_color, points)
+        # Integrate, age and compact expired particles to the back in one pass
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.age[:n] += 1
+        alive = self.age[:n] < self.lifetime[:n]
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        k = len(keep)
+        for name in self.FIELDS + ('color',):
+            arr = getattr(self, name)
+            arr[:k] = arr[keep]
+        self.count = k
+
+    def faded_colors(self, multiplier=1.0):
+        n = self.count
+        brightness = np.maximum(0.0, 1.0 - self.age[:n] / self.lifetime[:n]) * multiplier
+        brightness = brightness[:, None]
+        return (self.color[:n] * brightness + 255 * (1 - brightness)).astype(int)
+
+    def draw(self, surf, interp=1.0, camera_x=0.0, renderer=None):
+        n = self.count
+        if n == 0:
+            return
+        xs = (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * interp - camera_x).astype(int)
+        ys = (self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * interp).astype(int)
+        if renderer:
+            renderer.add_points(xs, ys, int(self.size[:n].max()) + PARTICLE_SIZE_GLOW_OFFSET + 1)
+        xs = xs.tolist()
+        ys = ys.tolist()
+        sizes = self.size[:n].tolist()
+        shapes = self.shape[:n].tolist()
+        colors = [tuple(c) for c in self.faded_colors().tolist()]
+        glow_colors = [tuple(c) for c in self.faded_colors(PARTICLE_GLOW_BRIGHTNESS_MULTIPLIER).tolist()]
+        draw_circle = pygame.draw.circle
+        draw_rect = pygame.draw.rect
+        for i in range(n):
+            x, y, size, shape = xs[i], ys[i], sizes[i], shapes[i]
+            if shape == PARTICLE_CIRCLE:
+                draw_circle(surf, colors[i], (x, y), size)
+            elif shape == PARTICLE_SQUARE:
+                draw_rect(surf, colors[i], (x - size, y - size, size * 2, size * 2))
+            else:
+                # Triangle pointing up
+                pygame.draw.polygon(surf, colors[i], [(x, y - size), (x - size, y + size), (x + size, y + size)])
+        # Glow pass on top for circles and squares
+        for i in range(n):
+            shape = shapes[i]
+            size = sizes[i] + PARTICLE_SIZE_GLOW_OFFSET
+            if shape == PARTICLE_CIRCLE:
+                draw_circle(surf, glow_colors[i], (xs[i], ys[i]), size)
+            elif shape == PARTICLE_SQUARE:
+                draw_rect(surf, glow_colors[i], (int(xs[i] - size / 2), int(ys[i] - size / 2), size, size))
 
 class Bird:
-    def __init__(self, x, y, images):
+    def __init__(self, x, y, images, rng=None):
+        self.rng = rng or random.Random()
         self.target_x = x
         self.x = x + 200  # Start off-screen to the right
         self.initial_y = y
         self.y = y
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.size = BIRD_SIZE
         self.health = BIRD_HEALTH
         self.active = True
         self.timer = 0
         self.text = ""
+        self.text_partial = False
         self.images = images
         self.frame = 0
         self.show_health_timer = 0
@@ -653,7 +1476,8 @@ class Bird:
         self.play_nibble_quote = False
         self.play_damaged_quote = False
 
-    def update(self, snake):
+    def update(self, snake, camera_x=0.0):
+        # The bird lives in screen space, the snake in world space
         self.timer += 1
         if self.state == 'appearing':
             self.x -= 15  # Fly in speed
@@ -668,8 +1492,8 @@ class Bird:
                 self.state = 'charging'
                 self.play_screech_sound = True
         elif self.state == 'charging':
-            head_x = snake.segments[0]['x']
-            head_y = snake.segments[0]['y']
+            head_x = snake.head_x - camera_x
+            head_y = snake.head_y
             dx = head_x - self.x
             dy = head_y - self.y
             dist = math.hypot(dx, dy)
@@ -678,9 +1502,7 @@ class Bird:
                 self.y += (dy / dist) * self.charge_speed
             if dist < self.size / 2 + snake.radius:
                 # Eat half of the segments
-                half = len(snake.segments) // 2
-                snake.segments = deque(list(snake.segments)[:half])
-                snake.length = half
+                snake.truncate(snake.length // 2)
                 snake.red_tint_timer = 15
                 self.play_hit_sound = True
                 self.play_nibble_quote = True
@@ -704,55 +1526,35 @@ class Bird:
             self.show_health_timer -= 1
         if self.shake_timer > 0:
             self.shake_timer -= 1
-            self.shake_offset = (random.randint(-5, 5), random.randint(-5, 5))
+            self.shake_offset = (self.rng.randint(-5, 5), self.rng.randint(-5, 5))
         else:
             self.shake_offset = (0, 0)
         if self.immunity_timer > 0:
             self.immunity_timer -= 1
 
-    def draw(self, surf):
-        scaled_image = pygame.transform.scale(self.images[self.frame], (self.size, self.size))
-        surf.blit(scaled_image, (int(self.x - self.size // 2 + self.shake_offset[0]), int(self.y - self.size // 2 + self.shake_offset[1])))
+    def draw(self, surf, dialogue, interp=1.0):
+        x = lerp(self.prev_x, self.x, interp)
+        y = lerp(self.prev_y, self.y, interp)
+        # Frames arrive pre-scaled to BIRD_SIZE from the game's sprite cache
+        # Returns the screen rects drawn to
+        scaled_image = self.images[self.frame]
+        rects = [surf.blit(scaled_image, (int(x - self.size // 2 + self.shake_offset[0]), int(y - self.size // 2 + self.shake_offset[1])))]
         if self.show_health_timer > 0:
-            bar_x = self.x - BIRD_HEALTH_BAR_WIDTH // 2
-            bar_y = self.y - self.size // 2 - 30
+            bar_x = x - BIRD_HEALTH_BAR_WIDTH // 2
+            bar_y = y - self.size // 2 - 30
             # Background
-            pygame.draw.rect(surf, BLACK, (bar_x, bar_y, BIRD_HEALTH_BAR_WIDTH, BIRD_HEALTH_BAR_HEIGHT), border_radius=5)
+            rects.append(pygame.draw.rect(surf, BLACK, (bar_x, bar_y, BIRD_HEALTH_BAR_WIDTH, BIRD_HEALTH_BAR_HEIGHT), border_radius=5))
             # Health fill
             health_width = max(0, (self.health / BIRD_HEALTH) * BIRD_HEALTH_BAR_WIDTH)
             pygame.draw.rect(surf, GREEN, (bar_x, bar_y, health_width, BIRD_HEALTH_BAR_HEIGHT), border_radius=5)
-        # Dialogue box at bottom
-        dialogue_rect = pygame.Rect(0, BIRD_DIALOGUE_Y, SCREEN_WIDTH, BIRD_DIALOGUE_HEIGHT)
-        pygame.draw.rect(surf, (0, 0, 0), dialogue_rect, border_radius=15)  # Black background
-        pygame.draw.rect(surf, WHITE, dialogue_rect, 2, border_radius=15)  # White border
-        font = pygame.font.Font('assets/font.ttf', BIRD_FONT_SIZE)
-        # Wrap text to fit within dialogue box
-        max_width = SCREEN_WIDTH - 100  # Padding
-        words = self.text.split(' ')
-        lines = []
-        current_line = ""
-        for word in words:
-            test_line = current_line + word + " "
-            if font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line.strip())
-                current_line = word + " "
-        if current_line:
-            lines.append(current_line.strip())
-        # Render each line
-        line_height = font.get_height()
-        line_spacing = line_height + 7  # Increase spacing
-        total_height = len(lines) * line_spacing - 3  # Adjust total height
-        start_y = BIRD_DIALOGUE_Y + (BIRD_DIALOGUE_HEIGHT - total_height) // 2
-        for i, line in enumerate(lines):
-            text_surf = font.render(line, True, WHITE)
-            text_rect = text_surf.get_rect(center=(SCREEN_WIDTH // 2, start_y + i * line_spacing + line_height // 2))
-            surf.blit(text_surf, text_rect)
+        # Dialogue box at bottom, lines pre-built by the dialogue renderer
+        rects.append(dialogue.draw(surf, self.text, self.text_partial))
+        return rects
 
-    def set_text(self, new_text):
+    def set_text(self, new_text, partial=False):
+        # Partial text is a quote still streaming in
         self.text = new_text
+        self.text_partial = partial
 
     def take_damage(self):
         self.health -= 1
@@ -775,46 +1577,1254 @@ class Bird:
         else:
             self.state = 'knockback'
 
-    def check_collision(self, bomb):
+    def __getstate__(self):
+        # Surfaces don't pickle, the game re-attaches its images when restoring a keyframe
+        state = self.__dict__.copy()
+        state['images'] = None
+        return state
+
+    def check_collision(self, bomb, camera_x=0.0):
         if self.immunity_timer > 0:
             return False
-        dist = math.hypot(bomb.x - self.x, bomb.y - self.y)
+        dist = math.hypot(bomb.x - camera_x - self.x, bomb.y - self.y)
         return dist < (self.size / 2 + bomb.radius + BOMB_COLLISION_MARGIN)
 
-class Game:
+def pack_input(dx, dy, fire):
+    # One byte per frame: 2 bits per axis (-1..1 stored as 0..2) plus the fire bit
+    return (dx + 1) | ((dy + 1) << 2) | (int(fire) << 4)
+
+def unpack_input(byte):
+    return (byte & 3) - 1, ((byte >> 2) & 3) - 1, bool(byte & 16)
+
+class ReplayRecorder:
+    # Collects per-frame inputs, state hashes and periodic keyframes for one run
+    def __init__(self, seed):
+        self.seed = seed
+        self.inputs = bytearray()
+        self.hashes = array('I')
+        self.keyframes = {}
+
+    @property
+    def frames(self):
+        return len(self.hashes)
+
+    def record_input(self, dx, dy, fire):
+        self.inputs.append(pack_input(dx, dy, fire))
+
+    def record_hash(self, state_hash):
+        self.hashes.append(state_hash)
+
+    def add_keyframe(self, frame, blob):
+        self.keyframes[frame] = blob
+
+    def save(self, path):
+        Replay(self.seed, bytes(self.inputs), self.hashes, self.keyframes).save(path)
+
+class Replay:
+    # File layout (little endian):
+    #   header   magic, version, seed, frame count, keyframe count, compressed input size
+    #   inputs   zlib-compressed, one byte per frame
+    #   hashes   one uint32 per frame
+    #   index    (frame, size) per keyframe, followed by the keyframe blobs
+    HEADER = struct.Struct('<4sHIIII')
+    KEYFRAME_ENTRY = struct.Struct('<II')
+
+    def __init__(self, seed, inputs, hashes, keyframes):
+        self.seed = seed
+        self.inputs = inputs
+        self.hashes = hashes
+        self.keyframes = keyframes
+
+    @property
+    def frames(self):
+        return len(self.hashes)
+
+    def input_at(self, frame):
+        if frame >= len(self.inputs):
+            return 0, 0, False
+        return unpack_input(self.inputs[frame])
+
+    def keyframe_before(self, frame):
+        candidates = [f for f in self.keyframes if f <= frame]
+        return max(candidates) if candidates else None
+
+    def save(self, path):
+        packed_inputs = zlib.compress(self.inputs, 9)
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, len(self.hashes), len(self.keyframes), len(packed_inputs)))
+            f.write(packed_inputs)
+            f.write(array('I', self.hashes).tobytes())
+            frames = sorted(self.keyframes)
+            for frame in frames:
+                f.write(self.KEYFRAME_ENTRY.pack(frame, len(self.keyframes[frame])))
+            for frame in frames:
+                f.write(self.keyframes[frame])
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, seed, frames, keyframe_count, inputs_size = cls.HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay")
+        offset = cls.HEADER.size
+        inputs = zlib.decompress(data[offset:offset + inputs_size])
+        offset += inputs_size
+        hashes = array('I')
+        hashes.frombytes(data[offset:offset + frames * hashes.itemsize])
+        offset += frames * hashes.itemsize
+        index = []
+        for _ in range(keyframe_count):
+            index.append(cls.KEYFRAME_ENTRY.unpack_from(data, offset))
+            offset += cls.KEYFRAME_ENTRY.size
+        keyframes = {}
+        for frame, size in index:
+            keyframes[frame] = data[offset:offset + size]
+            offset += size
+        return cls(seed, inputs, hashes, keyframes)
+
+class ReplayPlayer:
+    # Feeds a replay's inputs into a game and checks every frame against the recorded hash
+    def __init__(self, replay, game):
+        self.replay = replay
+        self.game = game
+        self.started = False
+        self.desync_frame = None
+
+    def __call__(self, game):
+        return self.replay.input_at(game.frame_count)
+
+    def start(self):
+        self.game.input_source = self
+        self.game.recorder = None
+        self.game.state = 'playing'
+        self.game.reset_game(seed=self.replay.seed)
+        self.started = True
+        self.desync_frame = None
+
+    @property
+    def finished(self):
+        return self.game.game_over or self.game.frame_count >= self.replay.frames
+
+    def step(self):
+        frame = self.game.frame_count
+        self.game.update()
+        if self.game.frame_count != frame and frame < self.replay.frames:
+            if self.game.state_hash() != self.replay.hashes[frame]:
+                if self.desync_frame is None:
+                    self.desync_frame = frame
+                return False
+        return True
+
+    def verify(self):
+        # Replays the whole run, returns the first frame that diverged or None
+        self.start()
+        while not self.finished:
+            self.step()
+        return self.desync_frame
+
+    def seek(self, frame):
+        # Jump to the nearest keyframe, then simulate the few frames after it
+        frame = min(frame, self.replay.frames)
+        keyframe = self.replay.keyframe_before(frame)
+        current = self.game.frame_count if self.started else None
+        if current is not None and current <= frame and (keyframe is None or keyframe <= current):
+            pass  # Already between the keyframe and the target, just keep stepping
+        elif keyframe is not None:
+            self.game.restore_state(self.replay.keyframes[keyframe])
+            self.game.input_source = self
+            self.game.state = 'playing'
+            self.started = True
+        else:
+            self.start()
+        while self.game.frame_count < frame and not self.game.game_over:
+            self.step()
+
+class CircuitBreaker:
+    # Stops calling a failing API. After max_failures failures in a row it opens and turns calls
+    # away; once cooldown has passed it lets one probe through, which closes it again on success.
+    def __init__(self, max_failures=QUOTE_BREAKER_FAILURES, cooldown=QUOTE_BREAKER_COOLDOWN):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, success):
+        with self.lock:
+            self.probing = False
+            if success:
+                if self.opened_at is not None:
+                    print("Grok API is back, closing the circuit breaker.")
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.max_failures:
+                if self.opened_at is None:
+                    print(f"Grok API failed {self.failures} times in a row, serving local quotes for a while.")
+                self.opened_at = time.monotonic()
+
+class LiveQuote:
+    # A quote the bird is waiting on. The worker that claims it streams text in as it
+    # arrives; the first quote to finish for the event, streamed or not, completes it.
     def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("snAIke")
+        self.text = ''
+        self.done = False
+        self.owner = None
+
+class QuoteWorkerPool:
+    # A few worker threads sharing one keep-alive HTTP session, fed from a priority queue.
+    # top_up() queues just enough requests to keep QUOTE_PREFETCH_DEPTH quotes per event
+    # ready in buffers, so the bird rarely has to wait on the API. When it does, watch()
+    # has the next request for that event streamed into live instead of the buffer.
+    SYSTEM_PROMPT = """
+            You are a witty bird that taunts a worm (the snake player) in an infinite runner Snake game.
+
+            Generate ONLY a short, funny quote that the bird can say to taunt the worm.
+
+            Make it humorous, clever, and related to the game, like the worm being slow, slimy, etc.
+
+            Do not include any numbers, times, or specific lengths in the quote.
+
+            If the event is 'dying', hint that the bird will be back soon.
+            
+            If the event is 'nibble', hint that the worm tastes good.
+            
+            If the event is 'appeared', hint that the bird is ready for action.
+            
+            If the event is 'damaged', hint that the bird is hurt.
+            
+            Output ONLY the quote text. No extra text or formatting.
+            """
+    BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT.replace(
+        "Output ONLY the quote text. No extra text or formatting.",
+        "Output ONLY a JSON object mapping each requested event to its list of quotes.")
+
+    def __init__(self, buffers=NEXT_QUOTES, context=None, accept=None, api_url=GROK_API_URL,
+                 api_key=GROK_API_KEY, workers=QUOTE_WORKERS, prefetch_depth=QUOTE_PREFETCH_DEPTH,
+                 streaming=QUOTE_STREAMING, batch_size=QUOTE_BATCH_SIZE, breaker=None,
+                 timeout=(QUOTE_CONNECT_TIMEOUT, QUOTE_READ_TIMEOUT)):
+        self.buffers = buffers
+        self.context = context or (lambda: [])  # recent quotes, so new ones vary
+        self.accept = accept  # accept(event, quote) stores a new quote, False drops it
+        self.api_url = api_url
+        self.api_key = api_key
+        self.prefetch_depth = prefetch_depth
+        self.streaming = streaming
+        self.batch_size = batch_size
+        self.live = {}  # event -> LiveQuote
+        # Seconds to the first streamed token, and per kind of hedged call ('single' quotes and
+        # 'batch' calls) to the whole answer, most recent last. Streams and batches take far
+        # longer than single calls, so each kind is hedged against its own p95
+        self.latency = {kind: deque(maxlen=QUOTE_LATENCY_SAMPLES) for kind in ('first_token', 'single', 'batch')}
+        # Per-event call counts by QUOTE_LATENCY_BUCKETS, the last bucket catches anything slower
+        self.histograms = {event: [0] * (len(QUOTE_LATENCY_BUCKETS) + 1) for event in buffers}
+        self.hedges = 0
+        self.timeout = timeout  # (connect, read) seconds
+        self.breaker = breaker or CircuitBreaker()
+        import requests  # only API mode pays for importing it
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+        self.requests = queue.PriorityQueue()
+        self.order = itertools.count()  # FIFO among equal priorities
+        self.pending = {event: 0 for event in buffers}
+        self.urgent = set()  # events with an urgent request still queued
+        self.lock = threading.Lock()
+        self.workers = [threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def top_up(self, event, urgent=False):
+        with self.lock:
+            depth = self.prefetch_depth.get(event, 1)
+            if urgent:
+                depth = max(depth, 1)  # the bird needs at least this one
+            missing = depth - len(self.buffers[event]) - self.pending[event]
+            if urgent and (event in self.urgent or (missing <= 0 and self.buffers[event])):
+                urgent = False  # one is already at the front of the queue, or a quote is ready
+            elif urgent and missing <= 0:
+                # The pending prefetches wait behind every other event's, put one ahead of them
+                missing = 1
+            if urgent:
+                self.urgent.add(event)
+            for i in range(missing):
+                priority = QUOTE_PRIORITY_URGENT if urgent and i == 0 else QUOTE_PRIORITY_PREFETCH
+                self.pending[event] += 1
+                self.requests.put((priority, next(self.order), event, False))
+
+    def top_up_all(self):
+        for event in self.buffers:
+            self.top_up(event)
+
+    def watch(self, event):
+        with self.lock:
+            self.live[event] = LiveQuote()
+
+    def unwatch(self, event):
+        # A quote still streaming for an unwatched event lands in the buffer as usual
+        with self.lock:
+            self.live.pop(event, None)
+
+    def live_quote(self, event):
+        # (text so far, finished) for a watched event, None once unwatched
+        with self.lock:
+            live = self.live.get(event)
+            return (live.text, live.done) if live else None
+
+    def work(self):
+        while True:
+            item = self.requests.get()
+            priority, _, event, _ = item
+            if priority == QUOTE_PRIORITY_STOP:
+                return
+            with self.lock:
+                live = self.live.get(event)
+                if live is not None and self.streaming and live.owner is None and not live.done:
+                    live.owner = threading.current_thread()
+                else:
+                    live = None
+            batch = [item] if live else [item] + self.gather(priority == QUOTE_PRIORITY_PREFETCH)
+            with self.lock:
+                self.urgent.difference_update(event for priority, _, event, _ in batch if priority == QUOTE_PRIORITY_URGENT)
+            counts = {}
+            refills = {}
+            for _, _, event, refill in batch:
+                counts[event] = counts.get(event, 0) + 1
+                refills[event] = refills.get(event, 0) + refill
+            if not self.breaker.allow():
+                # The game serves local quotes while the breaker is open, just drop the requests
+                for event, asked in counts.items():
+                    self.deliver(event, [], asked, live)
+                continue
+            if len(batch) == 1:
+                try:
+                    on_text = (lambda text: self.stream_into(live, text)) if live else None
+                    quote = self.request_quote(event, on_text)
+                    self.breaker.record(True)
+                except Exception as e:
+                    print(f"Error calling Grok API: {e}. Using fallback quote.")
+                    self.breaker.record(False)
+                    quote = None
+                self.deliver(event, [quote] if quote else [], 1, live)
+                continue
+            try:
+                quotes = self.request_batch(counts)
+                self.breaker.record(True)
+                retry = True
+            except Exception as e:
+                print(f"Error calling Grok API: {e}. Using fallback quote.")
+                self.breaker.record(False)
+                quotes = {}
+                retry = False  # don't hammer a failing API, the next top_up asks again
+            for event, asked in counts.items():
+                short = self.deliver(event, quotes.get(event, []), asked)
+                # Refill what a valid answer came up short by, once, in the smallest follow-up batch
+                short = min(short, asked - refills[event]) if retry else 0
+                if short > 0:
+                    with self.lock:
+                        self.pending[event] += short
+                        for _ in range(short):
+                            self.requests.put((QUOTE_PRIORITY_PREFETCH, next(self.order), event, True))
+
+    def gather(self, wait):
+        # Pull more queued requests into one call, waiting briefly for a prefetch burst to arrive
+        batch = []
+        deadline = time.monotonic() + (QUOTE_BATCH_WINDOW if wait else 0.0)
+        while len(batch) + 1 < self.batch_size:
+            try:
+                item = self.requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item[0] == QUOTE_PRIORITY_STOP:
+                self.requests.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def deliver(self, event, quotes, asked, live=None):
+        # Buffer up to asked quotes that accept() lets through, returning how many it came up short
+        quotes = quotes[:asked]
+        fresh = [quote for quote in quotes if self.accept is None or self.accept(event, quote)]
+        with self.lock:
+            self.pending[event] -= asked
+            waiting = self.live.get(event)
+            if waiting is not None and not waiting.done and waiting is live:
+                # Already typed into the dialogue box, so it's shown even if it's a near-duplicate,
+                # or the stream failed and the game falls back to local quotes
+                waiting.text = quotes[0] if quotes else None
+                waiting.done = True
+            elif waiting is not None and not waiting.done and fresh:
+                # The bird is waiting: hand the quote over directly
+                waiting.text = fresh.pop(0)
+                waiting.done = True
+                self.buffers[event].extend(fresh)
+            else:
+                self.buffers[event].extend(fresh)
+        return asked - len(fresh)
+
+    def stream_into(self, live, text):
+        with self.lock:
+            if not live.done:
+                live.text = text
+
+    def request_quote(self, event, on_text=None):
+        # on_text, when given, gets the text so far as it streams in
+        if not self.api_key:
+            print("GROK_API_KEY environment variable not set.")
+            return None
+        print(f"Generating bird quote with Grok API for event: {event}...")
+        previous = self.context()
+        previous_context = "\n".join(previous) if previous else "None"
+        # User prompt with dynamic adaptation
+        prompt = f"""
+
+            Event: {event}
+
+            Previous quotes: {previous_context}
+
+            Generate a taunting quote based on these stats and the event. The bird is alive and actively taunting. Make it varied from previous quotes.
+            """
+        data = {
+            'model': 'grok-4-fast-non-reasoning',
+            'messages': [
+                {'role': 'system', 'content': self.SYSTEM_PROMPT},
+                {'role': 'user', 'content': prompt}
+            ],
+            'stream': on_text is not None,
+            'temperature': GROK_TEMPERATURE  # Slight randomness for variety, but low for consistency
+        }
+        if on_text is None:
+            start = time.perf_counter()
+            result = self.post(data, [event], 'single')
+            quote = result['choices'][0]['message']['content'].strip()
+            print(f"Generated bird quote with Grok API in {(time.perf_counter() - start) * 1000:.0f} ms.")
+            return quote
+        start = time.perf_counter()
+        first_token = None
+        parts = []
+        # Streams aren't hedged, the read timeout bounds each gap between chunks instead
+        with self.session.post(self.api_url, json=data, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            # Server-sent events, one 'data: {chunk}' line per delta and 'data: [DONE]' at the end
+            for line in response.iter_lines(decode_unicode=True):
+                if not line.startswith('data:'):
+                    continue
+                payload = line[5:].strip()
+                if payload == '[DONE]':
+                    break
+                delta = json.loads(payload)['choices'][0].get('delta', {}).get('content')
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(delta)
+                on_text(''.join(parts).lstrip())
+        quote = ''.join(parts).strip()
+        total = time.perf_counter() - start
+        if first_token is not None:
+            self.latency['first_token'].append(first_token)
+            print(f"Streamed bird quote with Grok API: first token in {first_token * 1000:.0f} ms, done in {total * 1000:.0f} ms.")
+        self.record_latency([event], total)
+        return quote
+
+    def post(self, data, events, kind):
+        # POST with connect/read deadlines. A call still running past the recent p95 latency of
+        # its kind gets a hedged second copy, and whichever answers first wins.
+        start = time.perf_counter()
+        hedge_after = self.hedge_delay(kind)
+        results = queue.Queue()
+
+        def attempt():
+            try:
+                response = self.session.post(self.api_url, json=data, timeout=self.timeout)
+                response.raise_for_status()
+                results.put((True, response.json()))
+            except Exception as e:
+                results.put((False, e))
+
+        threading.Thread(target=attempt, daemon=True).start()
+        attempts = 1
+        try:
+            ok, result = results.get(timeout=hedge_after)
+        except queue.Empty:
+            self.hedges += 1
+            attempts = 2
+            threading.Thread(target=attempt, daemon=True).start()
+            ok, result = results.get()
+        if not ok and attempts == 2:
+            ok, result = results.get()  # the other copy may still come through
+        if not ok:
+            raise result
+        self.record_latency(events, time.perf_counter() - start, kind)
+        return result
+
+    def hedge_delay(self, kind):
+        # None (never hedge) until there are enough timings to trust the percentile
+        samples = sorted(self.latency[kind])
+        if len(samples) < QUOTE_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, len(samples) * QUOTE_HEDGE_PERCENTILE // 100)]
+
+    def record_latency(self, events, seconds, kind=None):
+        # Every call counts towards the histograms, only hedged kinds keep samples for hedge_delay()
+        if kind is not None:
+            self.latency[kind].append(seconds)
+        bucket = next((i for i, bound in enumerate(QUOTE_LATENCY_BUCKETS) if seconds <= bound), len(QUOTE_LATENCY_BUCKETS))
+        with self.lock:
+            for event in events:
+                self.histograms[event][bucket] += 1
+
+    def latency_report(self):
+        labels = [f"<={bound:g}s" for bound in QUOTE_LATENCY_BUCKETS] + [f">{QUOTE_LATENCY_BUCKETS[-1]:g}s"]
+        lines = [f"Grok API latency ({self.hedges} hedged calls):"]
+        with self.lock:
+            for event, counts in self.histograms.items():
+                if any(counts):
+                    lines.append(f"  {event:<9}" + "  ".join(f"{label} {count}" for label, count in zip(labels, counts) if count))
+        return "\n".join(lines)
+
+    def request_batch(self, counts):
+        # One structured-output call for several quotes across events, {event: [quote, ...]}
+        if not self.api_key:
+            print("GROK_API_KEY environment variable not set.")
+            return {}
+        total = sum(counts.values())
+        print(f"Generating {total} bird quotes with Grok API for events: {', '.join(counts)}...")
+        previous = self.context()
+        previous_context = "\n".join(previous) if previous else "None"
+        wanted = "\n".join(f"{event}: {count}" for event, count in counts.items())
+        prompt = f"""
+
+            Quotes wanted per event:
+            {wanted}
+
+            Previous quotes: {previous_context}
+
+            Generate that many taunting quotes for each event. The bird is alive and actively taunting. Make every quote different from the others and from previous quotes.
+            """
+        schema = {
+            'type': 'object',
+            'properties': {event: {'type': 'array', 'items': {'type': 'string'}} for event in counts},
+            'required': list(counts),
+            'additionalProperties': False
+        }
+        data = {
+            'model': 'grok-4-fast-non-reasoning',
+            'messages': [
+                {'role': 'system', 'content': self.BATCH_SYSTEM_PROMPT},
+                {'role': 'user', 'content': prompt}
+            ],
+            'response_format': {'type': 'json_schema', 'json_schema': {'name': 'bird_quotes', 'strict': True, 'schema': schema}},
+            'stream': False,
+            'temperature': GROK_TEMPERATURE
+        }
+        start = time.perf_counter()
+        content = self.post(data, list(counts), 'batch')['choices'][0]['message']['content']
+        try:
+            parsed = json.loads(content)
+        except ValueError:
+            print("Grok API returned malformed quote batch.")
+            return {}
+        if not isinstance(parsed, dict):
+            return {}
+        quotes = {}
+        for event in counts:
+            seen = set()
+            valid = []
+            for quote in parsed.get(event) or []:
+                quote = self.clean_quote(quote)
+                if quote and quote not in seen:
+                    seen.add(quote)
+                    valid.append(quote)
+            quotes[event] = valid
+        delivered = sum(min(len(quotes[event]), count) for event, count in counts.items())
+        print(f"Generated {delivered} of {total} bird quotes with Grok API in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        return quotes
+
+    @staticmethod
+    def clean_quote(quote):
+        # Drop anything the dialogue box can't show or the prompt ruled out
+        if not isinstance(quote, str):
+            return None
+        quote = quote.strip().strip('"')
+        if not quote or len(quote) > QUOTE_MAX_LENGTH or '\n' in quote or any(c.isdigit() for c in quote):
+            return None
+        return quote
+
+    def close(self):
+        for _ in self.workers:
+            self.requests.put((QUOTE_PRIORITY_STOP, next(self.order), None, False))
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+        self.session.close()
+        if any(any(counts) for counts in self.histograms.values()):
+            print(self.latency_report())
+
+class QuoteLog:
+    # Saved quotes go to an append-only line-delimited log written by a single thread,
+    # fsynced in batches. Once the log grows past QUOTE_LOG_COMPACT_ENTRIES the same thread
+    # rotates it and folds it into the JSON snapshot, so saves never rewrite the whole store.
+    def __init__(self, snapshot_path=QUOTES_PATH, log_path=QUOTE_LOG_PATH,
+                 fsync_interval=QUOTE_LOG_FSYNC_INTERVAL, compact_entries=QUOTE_LOG_COMPACT_ENTRIES):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.rotated_path = log_path + '.1'
+        self.fsync_interval = fsync_interval
+        self.compact_entries = compact_entries
+        self.entries = queue.Queue()
+        self.writer = None
+        self.lock = threading.Lock()
+
+    def append(self, event, quote):
+        with self.lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_loop, daemon=True)
+                self.writer.start()
+        self.entries.put((event, quote))
+
+    def write_loop(self):
+        log = open(self.log_path, 'a', encoding='utf-8')
+        logged = self.count_lines(self.log_path)
+        last_sync = time.monotonic()
+        dirty = False
+        running = True
+        while running:
+            try:
+                entry = self.entries.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                entry = False
+            # Drain whatever else is waiting into the same batch
+            batch = [] if entry is False else [entry]
+            while True:
+                try:
+                    batch.append(self.entries.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is None:
+                    running = False
+                    continue
+                event, quote = item
+                log.write(json.dumps({'event': event, 'quote': quote}) + '\n')
+                logged += 1
+                dirty = True
+            if dirty and (not running or time.monotonic() - last_sync >= self.fsync_interval):
+                log.flush()
+                os.fsync(log.fileno())
+                last_sync = time.monotonic()
+                dirty = False
+            if logged >= self.compact_entries:
+                log.close()
+                self.compact()
+                log = open(self.log_path, 'a', encoding='utf-8')
+                logged = self.count_lines(self.log_path)
+        log.close()
+
+    def compact(self):
+        # Rotate first so a crash mid-compaction never loses log lines; load() merges the
+        # rotated log too and drops exact duplicates, so a half-finished compaction is harmless
+        if not os.path.exists(self.rotated_path):
+            os.replace(self.log_path, self.rotated_path)
+        data = self.load()
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        os.remove(self.rotated_path)
+
+    @staticmethod
+    def count_lines(path):
+        try:
+            with open(path, 'rb') as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def load(self):
+        # Snapshot first, then the rotated and current logs in the order they were written
+        data = {event: [] for event in QUOTE_EVENTS}
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                for event, quotes in json.load(f).items():
+                    data[event] = list(quotes)
+        except FileNotFoundError:
+            pass
+        seen = {event: set(quotes) for event, quotes in data.items()}
+        for path in (self.rotated_path, self.log_path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
+                continue
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-write
+                event, quote = entry['event'], entry['quote']
+                if quote not in seen.setdefault(event, set()):
+                    seen[event].add(quote)
+                    data.setdefault(event, []).append(quote)
+        return data
+
+    def close(self):
+        if self.writer is not None:
+            self.entries.put(None)
+            self.writer.join(timeout=5.0)
+
+class QuoteModel:
+    # Offline quote generator: a word-level Markov chain per event, trained on the quote store.
+    # Each chain is compiled to flat tables (successor word ids with cumulative counts per
+    # context), so a walk is a dict lookup and a bisect per word. Compiled chains are cached
+    # on disk and only rebuilt when the corpus checksum changes.
+    START = 0
+    END = 1
+
+    def __init__(self, chains):
+        self.chains = chains  # event -> (words, contexts, successors, cumulative counts, originals)
+
+    @staticmethod
+    def checksum(corpus):
+        return zlib.crc32(json.dumps(corpus, sort_keys=True).encode('utf-8'))
+
+    @classmethod
+    def load(cls, corpus, path=QUOTE_MODEL_PATH, order=QUOTE_MODEL_ORDER):
+        key = (QUOTE_MODEL_VERSION, order, cls.checksum(corpus))
+        try:
+            with open(path, 'rb') as f:
+                cached_key, chains = pickle.load(f)
+            if cached_key == key:
+                return cls(chains)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            pass
+        chains = {event: cls.compile(quotes, order) for event, quotes in corpus.items() if quotes}
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, chains), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # still usable, just compiled again next run
+        return cls(chains)
+
+    @classmethod
+    def compile(cls, quotes, order):
+        words = ['<s>', '</s>']
+        ids = {}
+        counts = {}
+        for quote in quotes:
+            state = (cls.START,) * order
+            tokens = quote.split()
+            for word in tokens + [None]:
+                if word is None:
+                    word_id = cls.END
+                else:
+                    word_id = ids.get(word)
+                    if word_id is None:
+                        word_id = ids[word] = len(words)
+                        words.append(word)
+                following = counts.setdefault(state, {})
+                following[word_id] = following.get(word_id, 0) + 1
+                state = state[1:] + (word_id,)
+        contexts = {}
+        successors = array('I')
+        cumulative = array('I')
+        for state, following in counts.items():
+            lo = len(successors)
+            total = 0
+            for word_id, count in following.items():
+                total += count
+                successors.append(word_id)
+                cumulative.append(total)
+            contexts[state] = (lo, len(successors))
+        return words, contexts, successors, cumulative, frozenset(quotes)
+
+    def generate(self, event, rng):
+        # A line in the style of the event's quotes, preferring one the store doesn't already have
+        chain = self.chains.get(event)
+        if chain is None:
+            return None
+        words, contexts, successors, cumulative, originals = chain
+        start = (self.START,) * len(next(iter(contexts)))
+        quote = None
+        for _ in range(QUOTE_MODEL_ATTEMPTS):
+            state = start
+            line = []
+            for _ in range(QUOTE_MODEL_MAX_WORDS):
+                lo, hi = contexts[state]
+                pick = rng.randrange(cumulative[hi - 1])
+                word_id = successors[bisect_right(cumulative, pick, lo, hi)]
+                if word_id == self.END:
+                    break
+                line.append(words[word_id])
+                state = state[1:] + (word_id,)
+            candidate = ' '.join(line)
+            if len(candidate) > QUOTE_MAX_LENGTH:
+                continue
+            quote = candidate
+            if candidate not in originals:
+                break
+        return quote
+
+class QuoteIndex:
+    # Near-duplicate index over stored quotes. Each quote gets a MinHash signature over its word
+    # shingles, cut into LSH bands; quotes sharing any band hash are candidates, and candidates
+    # are confirmed by exact shingle overlap. Saved quotes sit in one sorted array of band keys
+    # (a binary search per lookup), quotes added since load in a dict next to it.
+    # Largest prime below 2**32: with every operand reduced below it, a * x + b stays under
+    # 2**64 and the minimum fits a uint32
+    PRIME = (1 << 32) - 5
+    MIX = np.uint64(0x100000001B3)
+
+    def __init__(self, path=QUOTE_INDEX_PATH, permutations=QUOTE_MINHASH_PERMUTATIONS, bands=QUOTE_LSH_BANDS):
+        self.path = path
+        self.bands = bands
+        self.rows = permutations // bands
+        coefficients = np.random.default_rng(QUOTE_INDEX_VERSION).integers(1, self.PRIME, size=(2, permutations), dtype=np.uint64)
+        self.a, self.b = coefficients
+        self.keys = []  # row -> (event, quote)
+        self.quotes = {}  # (event, quote) -> row
+        self.signatures = np.empty((0, permutations), dtype=np.uint32)
+        self.sorted_keys = np.empty(0, dtype=np.uint64)  # band keys of the rows loaded from disk
+        self.sorted_rows = np.empty(0, dtype=np.int64)
+        self.buckets = {}  # band key -> rows added since
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def shingles(quote):
+        words = re.findall(r"[a-z]+", quote.lower())
+        if len(words) < QUOTE_SHINGLE_WORDS:
+            return {' '.join(words)}
+        return {' '.join(words[i:i + QUOTE_SHINGLE_WORDS]) for i in range(len(words) - QUOTE_SHINGLE_WORDS + 1)}
+
+    def signature(self, shingles):
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) % self.PRIME for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        return ((np.outer(hashes, self.a) + self.b) % self.PRIME).min(axis=0).astype(np.uint32)
+
+    def band_keys(self, events, signatures):
+        # One 64-bit key per band of each signature, mixed with the band number and the event
+        # so different events never share a bucket
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        keys = np.arange(self.bands, dtype=np.uint64)[None, :] + np.array(
+            [zlib.crc32(event.encode('utf-8')) for event in events], dtype=np.uint64)[:, None] * self.MIX
+        for row in range(self.rows):
+            keys = keys * self.MIX ^ bands[:, :, row]
+        return keys
+
+    def similar(self, event, quote):
+        # Exact shingle similarity of the closest indexed quote, 0.0 without an LSH candidate
+        shingles = self.shingles(quote)
+        keys = self.band_keys([event], self.signature(shingles)[None])[0]
+        with self.lock:
+            return self.closest(shingles, keys)
+
+    def closest(self, shingles, keys):
+        # similar() for precomputed shingles and band keys, called with the lock held
+        lo = np.searchsorted(self.sorted_keys, keys, 'left')
+        hi = np.searchsorted(self.sorted_keys, keys, 'right')
+        rows = set()
+        for start, stop in zip(lo.tolist(), hi.tolist()):
+            rows.update(self.sorted_rows[start:stop].tolist())
+        for key in keys.tolist():
+            rows.update(self.buckets.get(key, ()))
+        best = 0.0
+        for row in rows:
+            other = self.shingles(self.keys[row][1])
+            best = max(best, len(shingles & other) / len(shingles | other))
+        return best
+
+    def add(self, event, quote, force=False):
+        # Index a quote unless it's a near-duplicate of an indexed one (force skips the check).
+        # Returns whether it was added. The check and the insert share one lock, so two
+        # near-duplicates added at once can't both get in.
+        shingles = self.shingles(quote)
+        signature = self.signature(shingles)
+        keys = self.band_keys([event], signature[None])[0]
+        with self.lock:
+            if (event, quote) in self.quotes:
+                return False
+            if not force and self.closest(shingles, keys) >= QUOTE_DUPLICATE_SIMILARITY:
+                return False
+            row = len(self.keys)
+            if row == len(self.signatures):
+                grown = np.empty((max(64, row * 2), self.signatures.shape[1]), dtype=np.uint32)
+                grown[:row] = self.signatures[:row]
+                self.signatures = grown
+            self.signatures[row] = signature
+            self.keys.append((event, quote))
+            self.quotes[(event, quote)] = row
+            for key in keys.tolist():
+                self.buckets.setdefault(key, []).append(row)
+            self.dirty = True
+        return True
+
+    def sync(self, corpus):
+        # Index whatever the store holds that the saved index hasn't seen yet
+        for event, quotes in corpus.items():
+            for quote in quotes:
+                if (event, quote) not in self.quotes:
+                    self.add(event, quote, force=True)
+
+    @classmethod
+    def load(cls, path=QUOTE_INDEX_PATH):
+        index = cls(path)
+        try:
+            with open(path, 'rb') as f:
+                version, keys, signatures = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return index
+        if version != QUOTE_INDEX_VERSION or signatures.shape[1] != len(index.a):
+            return index
+        index.keys = keys
+        index.quotes = {key: row for row, key in enumerate(keys)}
+        index.signatures = signatures
+        band_keys = index.band_keys([event for event, _ in keys], signatures).ravel()
+        order = np.argsort(band_keys, kind='stable')
+        index.sorted_keys = band_keys[order]
+        index.sorted_rows = order // index.bands
+        return index
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            keys = list(self.keys)
+            signatures = self.signatures[:len(keys)].copy()
+            self.dirty = False
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((QUOTE_INDEX_VERSION, keys, signatures), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+class QuoteCache:
+    # Parsed quote store shared by the whole process. refresh() only stats the files; when
+    # their mtime or size changed, a background thread re-reads them and swaps the result in
+    # as a single reference, so readers never see a half-loaded store.
+    def __init__(self, snapshot_path=QUOTES_PATH, log_path=QUOTE_LOG_PATH, model_path=QUOTE_MODEL_PATH,
+                 index_path=QUOTE_INDEX_PATH):
+        self.store = QuoteLog(snapshot_path, log_path)
+        self.model_path = model_path
+        self.index_path = index_path
+        self.duplicates = None  # QuoteIndex, loaded on first use
+        self.paths = (snapshot_path, self.store.rotated_path, log_path)
+        self.snapshot = None  # (file signature, {event: tuple of quotes}, QuoteModel or None)
+        self.use_model = False  # once asked for, reloads compile the model in the background too
+        self.loader = None
+        self.lock = threading.Lock()
+
+    def signature(self):
+        signature = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self):
+        signature = self.signature()
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot[0] == signature:
+            return
+        if snapshot is None:
+            # Nothing to serve yet, the very first load has to finish before play starts
+            self.reload(signature)
+            return
+        with self.lock:
+            if self.loader is not None and self.loader.is_alive():
+                return
+            self.loader = threading.Thread(target=self.reload, args=(signature,), daemon=True)
+            self.loader.start()
+
+    def reload(self, signature):
+        # The signature is taken before reading, so a write that lands mid-read triggers another reload
+        data = {event: tuple(quotes) for event, quotes in self.store.load().items()}
+        model = QuoteModel.load(data, self.model_path) if self.use_model else None
+        if self.duplicates is not None:
+            self.duplicates.sync(data)
+        self.snapshot = (signature, data, model)
+
+    def index(self):
+        # Near-duplicate index of the store, read from disk and caught up with it on first use
+        with self.lock:
+            if self.duplicates is None:
+                index = QuoteIndex.load(self.index_path)
+                if self.snapshot is not None:
+                    index.sync(self.snapshot[1])
+                self.duplicates = index
+            return self.duplicates
+
+    def save(self):
+        if self.duplicates is not None:
+            self.duplicates.save()
+
+    def model(self):
+        # The offline generator for the current quotes, read from disk or compiled on first use
+        snapshot = self.snapshot
+        if snapshot[2] is not None:
+            return snapshot[2]
+        self.use_model = True
+        model = QuoteModel.load(snapshot[1], self.model_path)
+        with self.lock:
+            if self.snapshot is snapshot:
+                self.snapshot = (snapshot[0], snapshot[1], model)
+        return model
+
+    def quotes(self, event):
+        snapshot = self.snapshot
+        return snapshot[1].get(event, ()) if snapshot else ()
+
+    def all_quotes(self):
+        snapshot = self.snapshot
+        return [quote for quotes in snapshot[1].values() for quote in quotes] if snapshot else []
+
+QUOTE_CACHE = QuoteCache()
+
+class StartupTrace:
+    # Wall time per startup phase, from launch to the first interactive menu frame
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.last = LAUNCH_TIME
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        for phase, seconds in self.phases:
+            print(f"{phase:<12}{seconds * 1000:8.1f} ms")
+        print(f"{'total':<12}{(self.last - LAUNCH_TIME) * 1000:8.1f} ms")
+
+class SilentSound:
+    # Stand-in for pygame.mixer.Sound when running without audio
+    def play(self, *args, **kwargs):
+        pass
+
+class AssetManager:
+    # Decodes images and sounds on a thread pool, so startup only waits for the assets the menu
+    # needs and the rest load behind it. An optional prebuilt bundle (--build-bundle) holds every
+    # asset already decoded, raw pixels and PCM in one memory-mapped file, so a cold start skips
+    # PNG and MP3 decoding altogether. Bundle entries whose source file changed are ignored.
+    HEADER = struct.Struct('<4sII')  # magic, version, index size
+    mixer_lock = threading.Lock()
+
+    def __init__(self, headless=False, bundle_path=ASSET_BUNDLE_PATH, workers=ASSET_WORKERS):
+        self.headless = headless
+        self.bundle, self.bundle_index = self.open_bundle(bundle_path)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = {}  # name -> future of the decoded asset
+        self.loaded = {}
+        for name, (path, _) in IMAGE_ASSETS.items():
+            self.pending[name] = self.executor.submit(self.decode_image, name, path)
+        for name, path in SOUND_ASSETS.items():
+            # Headless games never touch the mixer
+            if not headless:
+                self.pending[name] = self.executor.submit(self.decode_sound, name, path)
+        self.executor.shutdown(wait=False)
+
+    @classmethod
+    def open_bundle(cls, path):
+        try:
+            with open(path, 'rb') as f:
+                bundle = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None, {}
+        magic, version, index_size = cls.HEADER.unpack_from(bundle)
+        if magic != ASSET_BUNDLE_MAGIC or version != ASSET_BUNDLE_VERSION:
+            return None, {}
+        data_start = cls.HEADER.size + index_size
+        return memoryview(bundle)[data_start:], json.loads(bytes(bundle[cls.HEADER.size:data_start]))
+
+    def bundled(self, name, path):
+        entry = self.bundle_index.get(name)
+        if entry is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return entry  # shipped without sources, the bundle is all there is
+        return entry if entry['source'] == [st.st_mtime_ns, st.st_size] else None
+
+    def decode_image(self, name, path):
+        entry = self.bundled(name, path)
+        if entry is None:
+            return pygame.image.load(path)
+        pixels = self.bundle[entry['offset']:entry['offset'] + entry['length']]
+        return pygame.image.frombuffer(pixels, entry['size'], entry['format'])
+
+    @classmethod
+    def init_mixer(cls):
+        # Opening the audio device is slow, so it happens here on a worker rather than at startup
+        with cls.mixer_lock:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+
+    def decode_sound(self, name, path):
+        self.init_mixer()
+        entry = self.bundled(name, path)
+        # PCM is only reusable when the mixer runs in the format it was decoded for
+        if entry is None or entry['mixer'] != list(pygame.mixer.get_init() or ()):
+            return pygame.mixer.Sound(path)
+        return pygame.mixer.Sound(buffer=self.bundle[entry['offset']:entry['offset'] + entry['length']])
+
+    def ready(self, names=None):
+        return all(self.pending[name].done() for name in (names or self.pending) if name in self.pending)
+
+    def get(self, name):
+        # Waits for the asset if it's still decoding. Pixel format conversion happens here, on
+        # the calling thread, as it needs the display surface.
+        if name not in self.loaded:
+            if name in SOUND_ASSETS and self.headless:
+                asset = SilentSound()
+            else:
+                asset = self.pending.pop(name).result()
+            if name in IMAGE_ASSETS and not self.headless:
+                asset = asset.convert_alpha() if IMAGE_ASSETS[name][1] else asset.convert()
+            self.loaded[name] = asset
+        return self.loaded[name]
+
+    @classmethod
+    def build_bundle(cls, path=ASSET_BUNDLE_PATH):
+        # Decode every asset once and write the raw results into a bundle
+        try:
+            cls.init_mixer()
+            sounds = SOUND_ASSETS
+        except pygame.error as e:
+            print(f"No audio ({e}), bundling images only.")
+            sounds = {}
+        index = {}
+        blobs = []
+        offset = 0  # from the start of the data, which follows the index
+        for name, (source, alpha) in IMAGE_ASSETS.items():
+            image = pygame.image.load(source)
+            pixel_format = 'RGBA' if alpha else 'RGB'
+            blobs.append(pygame.image.tobytes(image, pixel_format))
+            index[name] = {'source': source, 'size': list(image.get_size()), 'format': pixel_format}
+        for name, source in sounds.items():
+            blobs.append(pygame.mixer.Sound(source).get_raw())
+            index[name] = {'source': source, 'mixer': list(pygame.mixer.get_init())}
+        for entry, blob in zip(index.values(), blobs):
+            st = os.stat(entry['source'])
+            entry.update(source=[st.st_mtime_ns, st.st_size], offset=offset, length=len(blob))
+            offset += len(blob)
+        index_json = json.dumps(index).encode('utf-8')
+        # Pad the index so pixel data starts 64-byte aligned
+        index_json = index_json.ljust(-(-(cls.HEADER.size + len(index_json)) // 64) * 64 - cls.HEADER.size)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(ASSET_BUNDLE_MAGIC, ASSET_BUNDLE_VERSION, len(index_json)))
+            f.write(index_json)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        return cls.HEADER.size + len(index_json) + offset
+
+class Game:
+    def __init__(self, headless=False, input_source=None, seed=None, record_path=None, dirty_rects=False, trace=None):
+        # Headless games never open a window or touch the mixer, read input from
+        # input_source instead of the keyboard and run on simulated time
+        self.headless = headless
+        self.input_source = input_source
+        self.trace = trace or StartupTrace()
+        if headless:
+            self.screen = None
+        else:
+            pygame.display.init()
+            pygame.font.init()
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("snAIke")
+        self.trace.mark('display')
+        # Dirty-rect mode only pushes the changed parts of each frame to the display
+        self.renderer = DirtyRectRenderer() if dirty_rects else FullRenderer()
         self.clock = pygame.time.Clock()
         self.menu_timer = 0
         self.distance_traveled = 0
-
-        # Load and tile background image
-        self.bg_image = pygame.image.load('assets/background.png').convert()
+        self.frame_count = 0
+        self.sim_time = 0
+        self.fire_requested = False
+
+        # Seeded runs: a fixed seed replays the same world, None picks a fresh seed every run
+        self.fixed_seed = seed
+        self.seed = seed
+        self.record_path = record_path
+        self.recorder = None
+
+        # Images and sounds decode on worker threads while the rest of startup runs
+        self.assets = AssetManager(headless)
+        self.sprites = SpriteCache()
+        self.segment_sprites = SegmentSpriteCache()
+        self.explosion_atlas = ExplosionAtlas()
+        # Fonts load once, static labels are rendered up front
+        if headless:
+            self.text = TextCache()
+        else:
+            self.text = TextCache((SCORE_FONT_SIZE, BIRD_FONT_SIZE, GAME_OVER_FONT_SIZE, RESTART_FONT_SIZE, MENU_TITLE_FONT_SIZE, MENU_BUTTON_FONT_SIZE))
+            self.text.prerender([
+                ("sn[AI]ke", MENU_TITLE_FONT_SIZE, (255, 255, 255)),
+                ("sn[AI]ke", MENU_TITLE_FONT_SIZE, (0, 0, 0)),
+                ("start", MENU_BUTTON_FONT_SIZE, (255, 255, 255)),
+                ("quit", MENU_BUTTON_FONT_SIZE, (255, 255, 255)),
+                ("GAME OVER", GAME_OVER_FONT_SIZE, RED),
+                ("restart", RESTART_FONT_SIZE, WHITE),
+                ("quit to menu", RESTART_FONT_SIZE, WHITE),
+            ])
+            self.build_ui()
+
+        # Tile the background image
+        self.bg_image = self.assets.get('background')
         self.bg_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         bg_w = self.bg_image.get_width()
         bg_h = self.bg_image.get_height()
         x = -(bg_w - SCREEN_WIDTH) / 2
         y = -(bg_h - SCREEN_HEIGHT) / 2
         self.bg_surface.blit(self.bg_image, (x, y))
-
-        # Load food and bomb images
-        self.food_image = pygame.image.load('assets/apple.png').convert_alpha()
-        self.bomb_image = pygame.image.load('assets/bomb.png').convert_alpha()
-        self.bird_image = pygame.image.load('assets/bird.png').convert_alpha()
-        self.bird_image2 = pygame.image.load('assets/bird2.png').convert_alpha()
-        # Load sounds
-        self.bomb_sound = pygame.mixer.Sound('assets/bomb.wav')
-        self.deadbird_sound = pygame.mixer.Sound('assets/deadbird.wav')
-        self.eat_sound = pygame.mixer.Sound('assets/eat.mp3')
-        self.hit_sound = pygame.mixer.Sound('assets/hit.wav')
-        self.screech_sound = pygame.mixer.Sound('assets/screech.wav')
-        self.click_sound = pygame.mixer.Sound('assets/click.wav')
+        # The menu draws over a dimmed copy of the background
+        self.menu_bg_surface = self.bg_surface.copy()
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        overlay.set_alpha(120)
+        overlay.fill((0, 0, 0))
+        self.menu_bg_surface.blit(overlay, (0, 0))
+        self.click_sound = self.assets.get('click_sound')
+        self.trace.mark('assets')
+        # Everything else is picked up once it's ready, or when a game starts
+        self.assets_loaded = False
+        if headless:
+            self.finish_assets()
         self.bombs = []
         self.bird = None
         self.last_bird_time = 0
         self.bird_quote = ""
         self.previous_quotes = []
+        self.quote_pool = None
+        self.live_quote_event = None  # event whose quote is streaming into the dialogue box
+        self.quote_log = QuoteLog()
         self.event_cycle = ['appeared', 'damaged', 'damaged', 'dying']
         self.event_index = 0
 
@@ -826,24 +2836,71 @@ class Game:
         self.birds_killed = 0
         self.bomb_cooldown = 60  # 1 second delay before bombs can be shot
 
-        self.load_quotes()
-
-
+        # Just the quotes on disk here; API mode starts its workers after the first menu frame
+        QUOTE_CACHE.refresh()
+        if headless:
+            self.dialogue = None
+        else:
+            self.dialogue = DialogueRenderer(self.text.font(BIRD_FONT_SIZE))
+            self.dialogue.prerender_async(QUOTE_CACHE.all_quotes() + [quote for quotes in NEXT_QUOTES.values() for quote in quotes])
+        self.trace.mark('quotes')
 
-    def reset_game(self):
-        self.snake = Snake(REST_POSITION, SCREEN_HEIGHT // 2)
+    def finish_assets(self):
+        # Waits for whatever is still decoding, then builds what the game itself draws with
+        if self.assets_loaded:
+            return
+        self.food_image = self.assets.get('apple')
+        self.bomb_image = self.assets.get('bomb')
+        self.bird_image = self.assets.get('bird')
+        self.bird_image2 = self.assets.get('bird2')
+        self.sprites.add('apple', self.food_image)
+        self.sprites.add('bomb', self.bomb_image)
+        self.sprites.add('bird', self.bird_image)
+        self.sprites.add('bird2', self.bird_image2)
+        if not self.headless:
+            self.sprites.warm(['apple', 'bomb'])
+            self.explosion_atlas.ensure()
+        self.bird_frames = [self.sprites.sized(name, (BIRD_SIZE, BIRD_SIZE)) for name in ('bird', 'bird2')]
+        self.bomb_sound = self.assets.get('bomb_sound')
+        self.deadbird_sound = self.assets.get('deadbird_sound')
+        self.eat_sound = self.assets.get('eat_sound')
+        self.hit_sound = self.assets.get('hit_sound')
+        self.screech_sound = self.assets.get('screech_sound')
+        self.assets_loaded = True
+
+    def get_ticks(self):
+        # Simulated milliseconds, so bird spawns follow sim steps rather than the wall clock
+        return int(self.sim_time)
+
+    def reset_game(self, seed=None):
+        self.finish_assets()
+        if seed is None:
+            seed = self.fixed_seed if self.fixed_seed is not None else random.randrange(2 ** 32)
+        self.seed = seed
+        self.spawn_rng = make_rng(seed, 'spawn')
+        self.fx_rng = make_rng(seed, 'fx')
+        self.quote_rng = make_rng(seed, 'quotes')
+        self.quote_bags = {}
+        self.fire_requested = False
+        self.snake = Snake(REST_POSITION, SCREEN_HEIGHT // 2, self.fx_rng)
         self.foods = []
         self.bomb_apples = []
         self.bombs = []
         self.bird = None
         self.obstacles = []
+        self.obstacle_grid = ObstacleGrid()
         self.explosions = []
-        self.particles = []
+        self.particles = ParticleSystem(MAX_PARTICLES, make_np_rng(seed, 'particles'))
         self.obstacle_queue = []
         self.distance_traveled = 0
-        self.next_food_spawn = random.randint(FOOD_SPAWN_DISTANCE_MIN, FOOD_SPAWN_DISTANCE_MAX)
-        self.next_obstacle_spawn = random.randint(OBSTACLE_SPAWN_DISTANCE_MIN, OBSTACLE_SPAWN_DISTANCE_MAX)
-        self.last_bird_time = pygame.time.get_ticks()
+        # Everything but the bird lives in world space, the camera scrolls over it
+        self.camera_x = 0.0
+        self.prev_camera_x = 0.0
+        self.frame_count = 0
+        self.sim_time = 0
+        self.next_food_spawn = self.spawn_rng.randint(FOOD_SPAWN_DISTANCE_MIN, FOOD_SPAWN_DISTANCE_MAX)
+        self.next_obstacle_spawn = self.spawn_rng.randint(OBSTACLE_SPAWN_DISTANCE_MIN, OBSTACLE_SPAWN_DISTANCE_MAX)
+        self.last_bird_time = self.get_ticks()
         self.game_over = False
 
         # Reset score tracking
@@ -852,119 +2909,198 @@ class Game:
         self.birds_killed = 0
 
         self.previous_quotes = []
+        self.stop_live_quote()
         self.load_quotes()
 
+        if self.record_path:
+            self.recorder = ReplayRecorder(seed)
+
     def spawn_food(self):
-        pixel_x_offset = SCREEN_WIDTH + GRID_SIZE
+        pixel_x_offset = self.camera_x + SCREEN_WIDTH + GRID_SIZE
         forbidden_positions = set((gx, gy) for obs in self.obstacles for gx, gy in obs.grid_positions)
         grid_x, grid_y = None, None
         for _ in range(SPAWN_ATTEMPTS):
-            candidate_x = random.randint(0, GRID_COLS - 1)
-            candidate_y = random.randint(1, GRID_ROWS - 2)
+            candidate_x = self.spawn_rng.randint(0, GRID_COLS - 1)
+            candidate_y = self.spawn_rng.randint(1, GRID_ROWS - 2)
             if (candidate_x, candidate_y) not in forbidden_positions:
                 grid_x, grid_y = candidate_x, candidate_y
                 break
         if grid_x is None:
-            grid_x = random.randint(0, GRID_COLS - 1)
-            grid_y = random.randint(1, GRID_ROWS - 2)
+            grid_x = self.spawn_rng.randint(0, GRID_COLS - 1)
+            grid_y = self.spawn_rng.randint(1, GRID_ROWS - 2)
         self.foods.append(Food(grid_x, grid_y, pixel_x_offset))
 
     def spawn_bomb_apple(self):
-        pixel_x_offset = SCREEN_WIDTH + GRID_SIZE
+        pixel_x_offset = self.camera_x + SCREEN_WIDTH + GRID_SIZE
         forbidden_positions = set((gx, gy) for obs in self.obstacles for gx, gy in obs.grid_positions)
         grid_x, grid_y = None, None
         for _ in range(SPAWN_ATTEMPTS):
-            candidate_x = random.randint(0, GRID_COLS - 1)
-            candidate_y = random.randint(0, GRID_ROWS - 1)
+            candidate_x = self.spawn_rng.randint(0, GRID_COLS - 1)
+            candidate_y = self.spawn_rng.randint(0, GRID_ROWS - 1)
             if (candidate_x, candidate_y) not in forbidden_positions:
                 grid_x, grid_y = candidate_x, candidate_y
                 break
         if grid_x is None:
-            grid_x = random.randint(0, GRID_COLS - 1)
-            grid_y = random.randint(0, GRID_ROWS - 1)
+            grid_x = self.spawn_rng.randint(0, GRID_COLS - 1)
+            grid_y = self.spawn_rng.randint(0, GRID_ROWS - 1)
         self.bomb_apples.append(BombApple(grid_x, grid_y, pixel_x_offset))
 
     def spawn_obstacle(self):
         forbidden_y = set(gy for obs in self.obstacles for gx, gy in obs.grid_positions if gx == 0)
-        num_tiles = random.randint(OBSTACLE_NUM_TILES_MIN, OBSTACLE_NUM_TILES_MAX)
-        start_grid_y = random.randint(0, GRID_ROWS - num_tiles)
+        num_tiles = self.spawn_rng.randint(OBSTACLE_NUM_TILES_MIN, OBSTACLE_NUM_TILES_MAX)
+        start_grid_y = self.spawn_rng.randint(0, GRID_ROWS - num_tiles)
         attempts = 0
         while any(start_grid_y + i in forbidden_y for i in range(num_tiles)) and attempts < SPAWN_ATTEMPTS:
-            start_grid_y = random.randint(0, GRID_ROWS - num_tiles)
+            start_grid_y = self.spawn_rng.randint(0, GRID_ROWS - num_tiles)
             attempts += 1
         grid_positions = [(0, start_grid_y + i) for i in range(num_tiles)]
         
-        new_obstacle = GridObstacle(grid_positions, pixel_x_offset=SCREEN_WIDTH + GRID_SIZE)
-        self.obstacles.append(new_obstacle)
-
-
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
-
-        dx, dy = 0, 0
-
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
-            dy = -1
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-            dy = 1
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-            dx = -1
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-            dx = 1
+        new_obstacle = GridObstacle(grid_positions, pixel_x_offset=self.camera_x + SCREEN_WIDTH + GRID_SIZE, rng=self.spawn_rng)
+        self.add_obstacle(new_obstacle)
 
+    def add_obstacle(self, obstacle):
+        self.obstacles.append(obstacle)
+        self.obstacle_grid.insert(obstacle)
 
+    def remove_obstacles(self, removed):
+        if not removed:
+            return
+        for obstacle in removed:
+            self.obstacle_grid.remove(obstacle)
+        removed = set(removed)
+        self.obstacles = [o for o in self.obstacles if o not in removed]
+
+    def blast_obstacles(self, x, y):
+        # Break every obstacle whose center is inside the explosion
+        broken = self.obstacle_grid.obstacles_in_radius(x, y, EXPLOSION_RADIUS)
+        for obstacle in broken:
+            self.emit_break_particles(obstacle)
+        self.remove_obstacles(broken)
+
+
+    def read_input_source(self):
+        # input_source is either a callable taking the game or a sequence indexed by frame,
+        # each entry being (dx, dy) or (dx, dy, fire)
+        if callable(self.input_source):
+            entry = self.input_source(self)
+        elif self.frame_count < len(self.input_source):
+            entry = self.input_source[self.frame_count]
+        else:
+            entry = (0, 0)
+        if entry is None:
+            return 0, 0, False
+        dx, dy = int(entry[0]), int(entry[1])
+        fire = bool(entry[2]) if len(entry) > 2 else False
+        return dx, dy, fire
 
+    def handle_input(self):
+        # Bomb presses from the event loop are queued and applied here, so they land on a sim frame
+        fire = self.fire_requested
+        self.fire_requested = False
+        if self.input_source is not None:
+            dx, dy, fire = self.read_input_source()
+        elif self.headless or not pygame.display.get_init():
+            dx, dy = 0, 0  # no window to read keys from, the snake just coasts
+        else:
+            keys = pygame.key.get_pressed()
+
+            dx, dy = 0, 0
+
+            if keys[pygame.K_w] or keys[pygame.K_UP]:
+                dy = -1
+            if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+                dy = 1
+            if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+                dx = -1
+            if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+                dx = 1
+
+        if self.recorder:
+            self.recorder.record_input(dx, dy, fire)
+        self.snake.move(dx, dy, self.camera_x)
+        if fire:
+            self.fire_bomb()
+
+    def fire_bomb(self):
+        if self.game_over or self.snake.length <= 2 or self.bomb_cooldown != 0:
+            return
+        x = self.snake.head_x
+        y = self.snake.head_y
+        angle = self.snake.facing_angle
+        vx = math.cos(angle) * BOMB_SPEED
+        vy = math.sin(angle) * BOMB_SPEED
+        self.bombs.append(Bomb(x, y, vx, vy))
+        # Cost 2 segments
+        self.snake.truncate(self.snake.length - 2)
+        self.bombs_shot += 1
+
+    def store_previous_positions(self):
+        # Snapshot of the last sim state, draw() interpolates from here to the current one
+        # Apples, obstacles and explosions don't move in world space, only the camera does
+        self.prev_camera_x = self.camera_x
+        self.snake.store_previous()
+        for entity in self.bombs:
+            entity.prev_x, entity.prev_y = entity.x, entity.y
+        self.particles.store_previous()
+        if self.bird:
+            self.bird.prev_x, self.bird.prev_y = self.bird.x, self.bird.y
 
+    def emit_explosion_particles(self, x, y):
+        self.particles.emit(x, y, BOMB_PARTICLE_COUNT,
+                            (BOMB_PARTICLE_VX_MIN, BOMB_PARTICLE_VX_MAX), (BOMB_PARTICLE_VY_MIN, BOMB_PARTICLE_VY_MAX),
+                            EXPLOSION_COLOR, BOMB_PARTICLE_LIFETIME, BOMB_PARTICLE_SIZE, PARTICLE_SQUARE)
 
-        self.snake.move(dx, dy)
+    def emit_break_particles(self, obstacle):
+        # One batched emit covering every tile of the broken obstacle
+        positions = obstacle.get_pixel_positions()
+        self.particles.emit([p[0] for p in positions], [p[1] for p in positions], BREAK_PARTICLE_COUNT,
+                            (BREAK_PARTICLE_VX_MIN, BREAK_PARTICLE_VX_MAX), (BREAK_PARTICLE_VY_MIN, BREAK_PARTICLE_VY_MAX),
+                            obstacle.color, BREAK_PARTICLE_LIFETIME, BREAK_PARTICLE_SIZE, PARTICLE_TRIANGLE)
 
     def update(self):
+        frame = self.frame_count
+        if self.recorder and not self.game_over and frame % KEYFRAME_INTERVAL == 0:
+            self.recorder.add_keyframe(frame, self.capture_state())
+        self.simulate()
+        if self.recorder and self.frame_count != frame:
+            self.recorder.record_hash(self.state_hash())
+            if self.game_over:
+                self.save_recording()
+
+    def simulate(self):
+        self.store_previous_positions()
+
         # Update dying animation first
         if self.snake.dying:
-            for seg in self.snake.segments:
-                seg['x'] += seg['vx']
-                seg['y'] += seg['vy']
-                seg['vx'] *= 0.98
-                seg['vy'] *= 0.98
-            self.snake.eye_y += self.snake.eye_fall_speed
-            self.snake.dying_timer += 1
+            self.snake.update_dying()
 
         if self.game_over:
             return
-        
-        self.snake.shift_world_scroll(SCROLL_SPEED)
+
+        self.camera_x += SCROLL_SPEED
         self.snake.red_tint_timer = max(0, self.snake.red_tint_timer - 1)
         self.bomb_cooldown = max(0, self.bomb_cooldown - 1)
         
         # Update snake segment scales
-        for seg in self.snake.segments:
-            if seg['scale'] < 1.0:
-                seg['scale'] = min(1.0, seg['scale'] + self.snake.grow_rate)
+        self.snake.grow_scales()
         
         for food in self.foods:
-            food.shift_left(SCROLL_SPEED)
             food.update()
         for bomb in self.bomb_apples:
-            bomb.shift_left(SCROLL_SPEED)
             bomb.update()
         for bomb in self.bombs:
-            bomb.shift_left(SCROLL_SPEED)
             bomb.update()
-        for obstacle in self.obstacles:
-            obstacle.shift_left(SCROLL_SPEED)
-        for explosion in self.explosions:
-            explosion.shift_left(SCROLL_SPEED)
-        for particle in self.particles:
-            particle.shift_left(SCROLL_SPEED)
 
 
         
         self.distance_traveled += SCROLL_SPEED
         self.handle_input()
+        self.frame_count += 1
+        self.sim_time += 1000 / FPS
         self.explosions = [e for e in self.explosions if e.update()]
-        self.particles = [p for p in self.particles if p.update()]
+        self.particles.update()
         if self.bird:
-            self.bird.update(self.snake)
+            self.bird.update(self.snake, self.camera_x)
             if self.bird.play_hit_sound:
                 self.hit_sound.play()
                 self.bird.play_hit_sound = False
@@ -983,30 +3119,31 @@ class Game:
         
         if self.distance_traveled >= self.next_food_spawn:
             self.spawn_food()
-            self.next_food_spawn += random.randint(SPAWN_INTERVAL_MIN, SPAWN_INTERVAL_MAX) * GRID_SIZE
+            self.next_food_spawn += self.spawn_rng.randint(SPAWN_INTERVAL_MIN, SPAWN_INTERVAL_MAX) * GRID_SIZE
         
         if self.distance_traveled >= self.next_obstacle_spawn:
             if self.obstacle_queue:
                 obs_def = self.obstacle_queue.pop(0)
-                new_obstacle = GridObstacle(obs_def['grid_positions'], pixel_x_offset=SCREEN_WIDTH + GRID_SIZE)
-                self.obstacles.append(new_obstacle)
+                new_obstacle = GridObstacle(obs_def['grid_positions'], pixel_x_offset=self.camera_x + SCREEN_WIDTH + GRID_SIZE, rng=self.spawn_rng)
+                self.add_obstacle(new_obstacle)
                 self.next_obstacle_spawn += obs_def['spacing']
             else:
                 self.spawn_obstacle()
-                self.next_obstacle_spawn += random.randint(SPAWN_INTERVAL_MIN, SPAWN_INTERVAL_MAX) * GRID_SIZE
+                self.next_obstacle_spawn += self.spawn_rng.randint(SPAWN_INTERVAL_MIN, SPAWN_INTERVAL_MAX) * GRID_SIZE
 
-        if pygame.time.get_ticks() - self.last_bird_time >= 10000 and self.bird is None:
+        if self.get_ticks() - self.last_bird_time >= 10000 and self.bird is None:
             y = SCREEN_HEIGHT // 2
-            self.bird = Bird(SCREEN_WIDTH - 100, y, [self.bird_image, self.bird_image2])
+            self.bird = Bird(SCREEN_WIDTH - 100, y, self.bird_frames, self.fx_rng)
             self.get_quote_by_event('appeared')
-            self.last_bird_time = pygame.time.get_ticks()
+            self.last_bird_time = self.get_ticks()
             # Screech when bird appears/attacks, but since appears first, perhaps on charge
 
         
-        self.foods = [f for f in self.foods if f.x > -FOOD_RADIUS * FOOD_REMOVE_OFFSET_MULTIPLIER]
-        self.bomb_apples = [b for b in self.bomb_apples if b.x > -BOMB_RADIUS * BOMB_REMOVE_OFFSET_MULTIPLIER]
+        camera_x = self.camera_x
+        self.foods = [f for f in self.foods if f.x - camera_x > -FOOD_RADIUS * FOOD_REMOVE_OFFSET_MULTIPLIER]
+        self.bomb_apples = [b for b in self.bomb_apples if b.x - camera_x > -BOMB_RADIUS * BOMB_REMOVE_OFFSET_MULTIPLIER]
         self.bombs = [b for b in self.bombs if b.active]
-        self.obstacles = [o for o in self.obstacles if o.pixel_x_offset > -OBSTACLE_REMOVE_OFFSET]
+        self.remove_obstacles([o for o in self.obstacles if o.pixel_x_offset - camera_x <= -OBSTACLE_REMOVE_OFFSET])
 
         
         for food in self.foods[:]:
@@ -1014,10 +3151,9 @@ class Game:
                 for _ in range(SEGMENTS_PER_FOOD):
                     self.snake.grow()
                 # spawn particles for eating apple
-                for _ in range(FOOD_PARTICLE_COUNT):
-                    vx = random.uniform(FOOD_PARTICLE_VX_MIN, FOOD_PARTICLE_VX_MAX)
-                    vy = random.uniform(FOOD_PARTICLE_VY_MIN, FOOD_PARTICLE_VY_MAX)
-                    self.particles.append(Particle(food.x, food.y, vx, vy, GREEN, FOOD_PARTICLE_LIFETIME, FOOD_PARTICLE_SIZE, 'circle'))
+                self.particles.emit(food.x, food.y, FOOD_PARTICLE_COUNT,
+                                    (FOOD_PARTICLE_VX_MIN, FOOD_PARTICLE_VX_MAX), (FOOD_PARTICLE_VY_MIN, FOOD_PARTICLE_VY_MAX),
+                                    GREEN, FOOD_PARTICLE_LIFETIME, FOOD_PARTICLE_SIZE, PARTICLE_CIRCLE)
                 self.eat_sound.play()
                 self.foods.remove(food)
                 self.apples_collected += 1
@@ -1030,73 +3166,30 @@ class Game:
                 self.explosions.append(Explosion(bomb_x, bomb_y))
                 self.bomb_sound.play()
                 # spawn particles for explosion
-                for _ in range(BOMB_PARTICLE_COUNT):
-                    vx = random.uniform(BOMB_PARTICLE_VX_MIN, BOMB_PARTICLE_VX_MAX)
-                    vy = random.uniform(BOMB_PARTICLE_VY_MIN, BOMB_PARTICLE_VY_MAX)
-                    self.particles.append(Particle(bomb_x, bomb_y, vx, vy, EXPLOSION_COLOR, BOMB_PARTICLE_LIFETIME, BOMB_PARTICLE_SIZE, 'square'))
-                obstacles_to_remove = []
-                for obstacle in self.obstacles:
-                    ox, oy = obstacle.get_center()
-                    dist = math.hypot(bomb_x - ox, bomb_y - oy)
-                    if dist < EXPLOSION_RADIUS:
-                        obstacles_to_remove.append(obstacle)
-                for obs in obstacles_to_remove:
-                    # spawn destruction particles for each grid in the obstacle
-                    for grid_pos in obs.grid_positions:
-                        gx, gy = grid_pos
-                        px, py = grid_to_pixel(gx, gy)
-                        actual_px = px + obs.pixel_x_offset
-                        actual_py = py
-                        for _ in range(BREAK_PARTICLE_COUNT):
-                            vx = random.uniform(BREAK_PARTICLE_VX_MIN, BREAK_PARTICLE_VX_MAX)
-                            vy = random.uniform(BREAK_PARTICLE_VY_MIN, BREAK_PARTICLE_VY_MAX)
-                            self.particles.append(Particle(actual_px, actual_py, vx, vy, obs.color, BREAK_PARTICLE_LIFETIME, BREAK_PARTICLE_SIZE, 'triangle'))
-                    self.obstacles.remove(obs)
+                self.emit_explosion_particles(bomb_x, bomb_y)
+                self.blast_obstacles(bomb_x, bomb_y)
                 self.snake.shrink(SNAKE_SHRINK_PERCENTAGE)
                 self.last_bomb_distance = self.distance_traveled
                 self.bomb_apples.remove(bomb)
         
         for bomb in self.bombs[:]:
-            if bomb.check_explode(self.obstacles) or bomb.timer >= bomb.max_timer:
+            if bomb.check_explode(self.obstacle_grid) or bomb.timer >= bomb.max_timer:
                 bomb_x, bomb_y = bomb.x, bomb.y
                 self.explosions.append(Explosion(bomb_x, bomb_y))
                 self.bomb_sound.play()
                 # spawn particles for explosion
-                for _ in range(BOMB_PARTICLE_COUNT):
-                    vx = random.uniform(BOMB_PARTICLE_VX_MIN, BOMB_PARTICLE_VX_MAX)
-                    vy = random.uniform(BOMB_PARTICLE_VY_MIN, BOMB_PARTICLE_VY_MAX)
-                    self.particles.append(Particle(bomb_x, bomb_y, vx, vy, EXPLOSION_COLOR, BOMB_PARTICLE_LIFETIME, BOMB_PARTICLE_SIZE, 'square'))
-                obstacles_to_remove = []
-                for obstacle in self.obstacles:
-                    ox, oy = obstacle.get_center()
-                    dist = math.hypot(bomb_x - ox, bomb_y - oy)
-                    if dist < EXPLOSION_RADIUS:
-                        obstacles_to_remove.append(obstacle)
-                for obs in obstacles_to_remove:
-                    # spawn destruction particles for each grid in the obstacle
-                    for grid_pos in obs.grid_positions:
-                        gx, gy = grid_pos
-                        px, py = grid_to_pixel(gx, gy)
-                        actual_px = px + obs.pixel_x_offset
-                        actual_py = py
-                        for _ in range(BREAK_PARTICLE_COUNT):
-                            vx = random.uniform(BREAK_PARTICLE_VX_MIN, BREAK_PARTICLE_VX_MAX)
-                            vy = random.uniform(BREAK_PARTICLE_VY_MIN, BREAK_PARTICLE_VY_MAX)
-                            self.particles.append(Particle(actual_px, actual_py, vx, vy, obs.color, BREAK_PARTICLE_LIFETIME, BREAK_PARTICLE_SIZE, 'triangle'))
-                    self.obstacles.remove(obs)
+                self.emit_explosion_particles(bomb_x, bomb_y)
+                self.blast_obstacles(bomb_x, bomb_y)
                 self.bombs.remove(bomb)
         
         if self.bird:
             for bomb in self.bombs[:]:
-                if self.bird.check_collision(bomb):
+                if self.bird.check_collision(bomb, self.camera_x):
                     bomb_x, bomb_y = bomb.x, bomb.y
                     self.explosions.append(Explosion(bomb_x, bomb_y))
                     self.bomb_sound.play()
                     # spawn particles for explosion
-                    for _ in range(BOMB_PARTICLE_COUNT):
-                        vx = random.uniform(BOMB_PARTICLE_VX_MIN, BOMB_PARTICLE_VX_MAX)
-                        vy = random.uniform(BOMB_PARTICLE_VY_MIN, BOMB_PARTICLE_VY_MAX)
-                        self.particles.append(Particle(bomb_x, bomb_y, vx, vy, EXPLOSION_COLOR, BOMB_PARTICLE_LIFETIME, BOMB_PARTICLE_SIZE, 'square'))
+                    self.emit_explosion_particles(bomb_x, bomb_y)
                     if self.bird.state == 'charging':
                         self.bird.stun()
                     else:
@@ -1114,142 +3207,150 @@ class Game:
                     self.bombs.remove(bomb)
                     break
                 
-        all_obstacles = self.obstacles[:]
-        for obstacle in all_obstacles:
-            if obstacle.check_collision(self.snake):
-                self.game_over = True
-                self.deadbird_sound.play()
-                if not self.snake.dying:
-                    self.snake.start_dying()
-                return
+        if self.obstacle_grid.obstacle_at(self.snake.head_x, self.snake.head_y) is not None:
+            self.game_over = True
+            self.deadbird_sound.play()
+            if not self.snake.dying:
+                self.snake.start_dying()
+            return
 
-        # Self collision check after length > 25
-        if len(self.snake.segments) > 25:
-            head = self.snake.segments[0]
-            segments = list(self.snake.segments)
-            for i in range(25, len(segments), 5):
-                seg = segments[i]
-                dist = math.hypot(head['x'] - seg['x'], head['y'] - seg['y'])
-                if dist < self.snake.radius * 2:
-                    self.game_over = True
-                    self.deadbird_sound.play()
-                    if not self.snake.dying:
-                        self.snake.start_dying()
-                    return
+        # Self collision against every non-neighbour segment
+        if self.snake.hits_body():
+            self.game_over = True
+            self.deadbird_sound.play()
+            if not self.snake.dying:
+                self.snake.start_dying()
+            return
 
         # Remove bird if it has fallen off screen
         if self.bird and self.bird.state == 'falling' and self.bird.y > SCREEN_HEIGHT + self.bird.size:
             self.bird = None
-            self.last_bird_time = pygame.time.get_ticks()
-
-    def draw(self):
-        self.screen.blit(self.bg_surface, (0, 0))
+            self.last_bird_time = self.get_ticks()
+
+    SIM_STATE_ATTRS = (
+        'seed', 'spawn_rng', 'fx_rng', 'quote_rng', 'snake', 'foods', 'bomb_apples', 'bombs', 'bird',
+        'obstacles', 'obstacle_grid', 'explosions', 'particles', 'obstacle_queue', 'distance_traveled', 'camera_x', 'next_food_spawn',
+        'next_obstacle_spawn', 'last_bird_time', 'game_over', 'apples_collected', 'bombs_shot',
+        'birds_killed', 'bomb_cooldown', 'frame_count', 'sim_time', 'bird_quote', 'previous_quotes',
+        'quote_bags',
+    )
+
+    def capture_state(self):
+        state = {name: getattr(self, name) for name in self.SIM_STATE_ATTRS}
+        return zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+    def restore_state(self, blob):
+        state = pickle.loads(zlib.decompress(blob))
+        for name, value in state.items():
+            setattr(self, name, value)
+        if self.bird:
+            self.bird.images = self.bird_frames
+        self.fire_requested = False
+
+    def state_hash(self):
+        # Cheap per-frame fingerprint of the gameplay state, used to verify replays
+        snake = self.snake
+        positions = snake.seg_x[:snake.length].tobytes() + snake.seg_y[:snake.length].tobytes()
+        bird = self.bird
+        summary = struct.pack(
+            '<IdiiiiiiiiiddI',
+            self.frame_count, self.distance_traveled, snake.length,
+            len(self.foods), len(self.bomb_apples), len(self.bombs), len(self.obstacles),
+            self.apples_collected, self.bombs_shot, self.birds_killed,
+            bird.health if bird else -1,
+            bird.x if bird else 0.0, bird.y if bird else 0.0,
+            self.next_food_spawn + self.next_obstacle_spawn,
+        )
+        return zlib.crc32(positions, zlib.crc32(summary))
+
+    def save_recording(self):
+        if self.recorder and self.recorder.frames and self.record_path:
+            self.recorder.save(self.record_path)
+
+    def draw(self, interp=1.0):
+        # interp blends between the previous and current sim step (0..1)
+        renderer = self.renderer
+        renderer.restore(self.screen, self.bg_surface)
+        camera_x = lerp(self.prev_camera_x, self.camera_x, interp)
 
         for obstacle in self.obstacles:
-            obstacle.draw(self.screen)
-        for food in self.foods:
-            food.draw(self.screen, self.food_image)
-        for bomb in self.bomb_apples:
-            bomb.draw(self.screen, self.bomb_image)
-        for bomb in self.bombs:
-            bomb.draw(self.screen, self.bomb_image)
+            renderer.add(obstacle.draw(self.screen, camera_x))
+        # Apples, bomb apples and bombs share one batched blit
+        sprite_blits = [food.sprite(self.sprites, 'apple', camera_x) for food in self.foods]
+        sprite_blits += [bomb.sprite(self.sprites, 'bomb', camera_x) for bomb in self.bomb_apples]
+        sprite_blits = [item for item in sprite_blits if item is not None]
+        sprite_blits += [bomb.sprite(self.bomb_image, interp, camera_x) for bomb in self.bombs]
+        renderer.extend(self.screen.blits(sprite_blits))
         if self.bird:
-            self.bird.draw(self.screen)
+            renderer.extend(self.bird.draw(self.screen, self.dialogue, interp))
         for explosion in self.explosions:
-            explosion.draw(self.screen)
-        # Draw particles main
-        for particle in self.particles:
-            particle.draw(self.screen)
-        # Draw particle glow effects
-        for particle in self.particles:
-            if particle.timer < particle.lifetime:
-                glow_brightness = max(0, 1 - particle.timer / particle.lifetime) * PARTICLE_GLOW_BRIGHTNESS_MULTIPLIER  # brighter glow
-                r, g, b = particle.original_color
-                glow_color = (int(r * glow_brightness + 255 * (1 - glow_brightness)), int(g * glow_brightness + 255 * (1 - glow_brightness)), int(b * glow_brightness + 255 * (1 - glow_brightness)))
-                if particle.shape == 'circle':
-                    pygame.draw.circle(self.screen, glow_color, (int(particle.x), int(particle.y)), particle.size + PARTICLE_SIZE_GLOW_OFFSET)
-                elif particle.shape == 'square':
-                    size = particle.size + PARTICLE_SIZE_GLOW_OFFSET
-                    pygame.draw.rect(self.screen, glow_color, (int(particle.x - size/2), int(particle.y - size/2), size, size))
-        self.snake.draw(self.screen)
+            renderer.add(explosion.draw(self.screen, self.explosion_atlas, camera_x))
+        self.particles.draw(self.screen, interp, camera_x, renderer)
+        self.snake.draw(self.screen, self.segment_sprites, interp, camera_x, renderer)
 
         # Draw score
         score = self.apples_collected - self.bombs_shot + (10 * self.birds_killed)
-        font = pygame.font.Font('assets/font.ttf', 48)
-        score_text = font.render(f"score: {score}", True, BLACK)
+        score_text = self.text.render(f"score: {score}", SCORE_FONT_SIZE, BLACK)
         text_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, 30))
-        self.screen.blit(score_text, text_rect)
+        renderer.add(self.screen.blit(score_text, text_rect))
 
         if self.game_over:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(GAME_OVER_OVERLAY_ALPHA)
-            overlay.fill(BLACK)
-            self.screen.blit(overlay, (0, 0))
-            font = pygame.font.Font('assets/font.ttf', GAME_OVER_FONT_SIZE)
-            game_over_text = font.render("GAME OVER", True, RED)
+            renderer.invalidate()
+            self.screen.blit(self.game_over_overlay, (0, 0))
+            game_over_text = self.text.render("GAME OVER", GAME_OVER_FONT_SIZE, RED)
             text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + GAME_OVER_TEXT_Y_OFFSET))
             self.screen.blit(game_over_text, text_rect)
-            small_font = pygame.font.Font('assets/font.ttf', RESTART_FONT_SIZE)
-            restart_text = small_font.render("restart", True, WHITE)
-            quit_text = small_font.render("quit to menu", True, WHITE)
-            restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + RESTART_TEXT_Y_OFFSET - 50))
-            quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + RESTART_TEXT_Y_OFFSET + 140))
-            self.restart_button_rect = pygame.Rect(restart_rect.left - 50, restart_rect.top - 25, restart_rect.width + 100, restart_rect.height + 50)
-            self.quit_to_menu_button_rect = pygame.Rect(quit_rect.left - 50, quit_rect.top - 25, quit_rect.width + 100, quit_rect.height + 50)
             mouse_pos = pygame.mouse.get_pos()
-            restart_hover = self.restart_button_rect.collidepoint(mouse_pos)
-            quit_hover = self.quit_to_menu_button_rect.collidepoint(mouse_pos)
-            restart_color = (0, 200, 0) if restart_hover else (0, 150, 0)
-            quit_color = (200, 0, 0) if quit_hover else (150, 0, 0)
-            pygame.draw.rect(self.screen, restart_color, self.restart_button_rect, border_radius=15)
-            pygame.draw.rect(self.screen, quit_color, self.quit_to_menu_button_rect, border_radius=15)
-            pygame.draw.rect(self.screen, WHITE, self.restart_button_rect, 4, border_radius=15)
-            pygame.draw.rect(self.screen, WHITE, self.quit_to_menu_button_rect, 4, border_radius=15)
-            self.screen.blit(restart_text, restart_rect)
-            self.screen.blit(quit_text, quit_rect)
+            self.restart_button.draw(self.screen, self.restart_button.hovered(mouse_pos))
+            self.quit_to_menu_button.draw(self.screen, self.quit_to_menu_button.hovered(mouse_pos))
+        # The menu has to be composited again after any game frame
+        self.menu_shown = None
         
-        pygame.display.flip()
+        renderer.present()
+
+    def build_ui(self):
+        # Static UI layers: overlays, titles and both states of every button are built once,
+        # frames only pick the right button images and place the bobbing title
+        self.game_over_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.game_over_overlay.set_alpha(GAME_OVER_OVERLAY_ALPHA)
+        self.game_over_overlay.fill(BLACK)
+        green, green_hover = (0, 150, 0), (0, 200, 0)
+        red, red_hover = (150, 0, 0), (200, 0, 0)
+        menu_white = (255, 255, 255)
+        self.start_button = Button(self.text.render("start", MENU_BUTTON_FONT_SIZE, menu_white), (SCREEN_WIDTH // 2, 550), green, green_hover, menu_white)
+        self.quit_button = Button(self.text.render("quit", MENU_BUTTON_FONT_SIZE, menu_white), (SCREEN_WIDTH // 2, 750), red, red_hover, menu_white)
+        self.restart_button = Button(self.text.render("restart", RESTART_FONT_SIZE, WHITE),
+                                     (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + RESTART_TEXT_Y_OFFSET - 50), green, green_hover)
+        self.quit_to_menu_button = Button(self.text.render("quit to menu", RESTART_FONT_SIZE, WHITE),
+                                          (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + RESTART_TEXT_Y_OFFSET + 140), red, red_hover)
+        self.start_button_rect = self.start_button.rect
+        self.quit_button_rect = self.quit_button.rect
+        self.restart_button_rect = self.restart_button.rect
+        self.quit_to_menu_button_rect = self.quit_to_menu_button.rect
+        # What the menu last showed, None forces the next menu frame to be composited
+        self.menu_shown = None
 
     def draw_menu(self):
-        self.menu_timer += 1
-        self.screen.blit(self.bg_surface, (0, 0))
-        # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(120)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
-
-        font_large = pygame.font.Font('assets/font.ttf', 192)
-        font_button = pygame.font.Font('assets/font.ttf', 96)
-        title_text = font_large.render("sn[AI]ke", True, (255, 255, 255))
-        start_text = font_button.render("start", True, (255, 255, 255))
-        quit_text = font_button.render("quit", True, (255, 255, 255))
         title_y = 300 + math.sin(self.menu_timer * 0.05) * 10
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, title_y))
-        start_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, 550))
-        quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH // 2, 750))
-
-        # Title shadow
-        title_shadow = font_large.render("sn[AI]ke", True, (0, 0, 0))
-        self.screen.blit(title_shadow, (title_rect.x + 5, title_rect.y + 5))
-
-        # Draw button backgrounds with colors and borders
-        self.start_button_rect = pygame.Rect(start_rect.left - 50, start_rect.top - 25, start_rect.width + 100, start_rect.height + 50)
-        self.quit_button_rect = pygame.Rect(quit_rect.left - 50, quit_rect.top - 25, quit_rect.width + 100, quit_rect.height + 50)
         mouse_pos = pygame.mouse.get_pos()
-        start_hover = self.start_button_rect.collidepoint(mouse_pos)
-        quit_hover = self.quit_button_rect.collidepoint(mouse_pos)
-        start_color = (0, 200, 0) if start_hover else (0, 150, 0)
-        quit_color = (200, 0, 0) if quit_hover else (150, 0, 0)
-        pygame.draw.rect(self.screen, start_color, self.start_button_rect, border_radius=15)
-        pygame.draw.rect(self.screen, quit_color, self.quit_button_rect, border_radius=15)
-        pygame.draw.rect(self.screen, (255, 255, 255), self.start_button_rect, 4, border_radius=15)
-        pygame.draw.rect(self.screen, (255, 255, 255), self.quit_button_rect, 4, border_radius=15)
-
-        self.screen.blit(title_text, title_rect)
-        self.screen.blit(start_text, start_rect)
-        self.screen.blit(quit_text, quit_rect)
-        pygame.display.flip()
+        start_hover = self.start_button.hovered(mouse_pos)
+        quit_hover = self.quit_button.hovered(mouse_pos)
+        # Nothing to do while the title sits on the same pixel row and no hover changed
+        shown = (int(title_y), start_hover, quit_hover)
+        if shown == self.menu_shown:
+            return
+        self.menu_shown = shown
+
+        renderer = self.renderer
+        renderer.restore(self.screen, self.menu_bg_surface)
+        title_text = self.text.render("sn[AI]ke", MENU_TITLE_FONT_SIZE, (255, 255, 255))
+        title_shadow = self.text.render("sn[AI]ke", MENU_TITLE_FONT_SIZE, (0, 0, 0))
+        title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, title_y))
+        renderer.add(self.screen.blit(title_shadow, (title_rect.x + 5, title_rect.y + 5)))
+        renderer.add(self.start_button.draw(self.screen, start_hover))
+        renderer.add(self.quit_button.draw(self.screen, quit_hover))
+        renderer.add(self.screen.blit(title_text, title_rect))
+        renderer.present()
 
     def get_player_stats(self):
         length = self.snake.length if hasattr(self, 'snake') and self.snake else 0
@@ -1260,121 +3361,104 @@ class Game:
         }
 
     def load_quotes(self):
-        if USE_TEXT_QUOTES:
-            try:
-                with open('quotes.json', 'r') as f:
-                    data = json.load(f)
-                    for event, quotes in data.items():
-                        NEXT_QUOTES[event] = quotes
-            except FileNotFoundError:
-                pass
-        else:
-            for event in ['appeared', 'damaged', 'dying', 'nibble']:
-                if not NEXT_QUOTES[event]:
-                    threading.Thread(target=self._generate_quote, args=(event,)).start()
+        # Parsed once per process, re-read in the background only if the files changed.
+        # API mode keeps it too, to serve from while the API is down.
+        QUOTE_CACHE.refresh()
+        if not USE_TEXT_QUOTES:
+            QUOTE_CACHE.model()
+            if self.quote_pool is None:
+                self.quote_pool = QuoteWorkerPool(context=lambda: self.previous_quotes[-3:], accept=self.save_quote)
+            self.quote_pool.top_up_all()
 
     def save_quote(self, event, quote):
-        try:
-            with open('quotes.json', 'r') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            data = {'appeared': [], 'damaged': [], 'dying': [], 'nibble': []}
-        if event not in data:
-            data[event] = []
-        data[event].append(quote)
-        with open('quotes.json', 'w') as f:
-            json.dump(data, f, indent=4)
+        # Near-duplicates of stored quotes are dropped, returns whether the quote was saved
+        if not QUOTE_CACHE.index().add(event, quote):
+            return False
+        self.quote_log.append(event, quote)
+        return True
+
+    def draw_quote(self, event, quotes):
+        # O(1) pick from a shuffled bag of indices, refilled once empty or when the quotes changed
+        bag = self.quote_bags.get(event)
+        if bag is None or bag[0] != len(quotes) or not bag[1]:
+            last = bag[2] if bag else None
+            indices = list(range(len(quotes)))
+            self.quote_rng.shuffle(indices)
+            # Bags are drawn from the end, don't open a new one with the quote just shown
+            if len(indices) > 1 and indices[-1] == last:
+                indices[0], indices[-1] = indices[-1], indices[0]
+            bag = self.quote_bags[event] = [len(quotes), indices, last]
+        index = bag[1].pop()
+        bag[2] = index
+        return quotes[index]
+
+    def local_quote(self, event):
+        # Without the API, make up a fresh line offline; text mode sticks to the stored ones
+        if not USE_TEXT_QUOTES:
+            quote = QUOTE_CACHE.model().generate(event, self.quote_rng)
+            if quote:
+                return quote
+        quotes = QUOTE_CACHE.quotes(event)
+        return self.draw_quote(event, quotes) if quotes else FALLBACK_QUOTE
+
+    def stop_live_quote(self):
+        if self.live_quote_event is not None:
+            self.quote_pool.unwatch(self.live_quote_event)
+            self.live_quote_event = None
+
+    def poll_live_quote(self):
+        # Typewriter the streaming quote into the dialogue box, then settle on the final line
+        live = self.quote_pool.live_quote(self.live_quote_event)
+        if live is None:
+            self.live_quote_event = None
+            return
+        text, done = live
+        if done:
+            event = self.live_quote_event
+            self.stop_live_quote()
+            self.bird_quote = text or self.local_quote(event)
+            self.previous_quotes = (self.previous_quotes + [self.bird_quote])[-5:]
+            if self.bird:
+                self.bird.set_text(self.bird_quote)
+        elif self.bird and text != self.bird.text:
+            self.bird.set_text(text, partial=True)
 
     def get_quote_by_event(self, event='regular'):
-        if NEXT_QUOTES[event] and not USE_TEXT_QUOTES:
+        self.stop_live_quote()
+        ready = not USE_TEXT_QUOTES and bool(NEXT_QUOTES[event])
+        if ready:
             self.bird_quote = NEXT_QUOTES[event].pop(0)
-            self.previous_quotes.append(self.bird_quote)
-        elif NEXT_QUOTES[event] and USE_TEXT_QUOTES:
-            self.bird_quote = random.choice(NEXT_QUOTES[event])
-            self.previous_quotes.append(self.bird_quote)
+        elif USE_TEXT_QUOTES or self.quote_pool.breaker.open or not self.quote_pool.streaming:
+            # Straight from the store on disk, in text mode or while the API can't answer in time
+            self.bird_quote = self.local_quote(event)
         else:
-            fallback = "You're just a slimy worm!"
-            self.bird_quote = fallback
-            self.previous_quotes.append(fallback)
+            # Nothing buffered, stream the next quote for this event in as it's generated
+            self.quote_pool.watch(event)
+            self.live_quote_event = event
+            self.bird_quote = ""
+        if self.bird_quote:
+            self.previous_quotes.append(self.bird_quote)
         self.previous_quotes = self.previous_quotes[-5:]
         if self.bird:
             self.bird.set_text(self.bird_quote)
-        if not USE_TEXT_QUOTES:
-            threading.Thread(target=self._generate_quote, args=(event,)).start()
-
-    def _generate_quote(self, event):
-        should_save = True
-        print(f"Generating bird quote with Grok API for event: {event}...")
-        if not GROK_API_KEY:
-            print("GROK_API_KEY environment variable not set.")
+            if self.dialogue and self.bird_quote:
+                self.dialogue.lines(self.bird_quote)
+        if self.quote_pool:
+            # Refill what was just used, ahead of the queue if the buffer had run dry
+            self.quote_pool.top_up(event, urgent=not ready)
+
+    def step(self):
+        # One fixed simulation step
+        if self.state == 'menu':
+            self.menu_timer += 1
         else:
-            stats = self.get_player_stats()
-            previous_context = "\n".join(self.previous_quotes[-3:]) if self.previous_quotes else "None"
-            system_prompt = """
-            You are a witty bird that taunts a worm (the snake player) in an infinite runner Snake game.
-
-            Generate ONLY a short, funny quote that the bird can say to taunt the worm.
-
-            Make it humorous, clever, and related to the game, like the worm being slow, slimy, etc.
-
-            Do not include any numbers, times, or specific lengths in the quote.
-
-            If the event is 'dying', hint that the bird will be back soon.
-            
-            If the event is 'nibble', hint that the worm tastes good.
-            
-            If the event is 'appeared', hint that the bird is ready for action.
-            
-            If the event is 'damaged', hint that the bird is hurt.
-            
-            Output ONLY the quote text. No extra text or formatting.
-            """
-
-            # User prompt with dynamic adaptation
-            prompt = f"""
-
-            Event: {event}
-
-            Previous quotes: {previous_context}
-
-            Generate a taunting quote based on these stats and the event. The bird is alive and actively taunting. Make it varied from previous quotes.
-            """
-
-            # API call with improvements
-            headers = {
-                'Authorization': f'Bearer {GROK_API_KEY}',
-                'Content-Type': 'application/json'
-            }
-            data = {
-                'model': 'grok-4-fast-non-reasoning',
-                'messages': [
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': prompt}
-                ],
-                'stream': False,
-                'temperature': GROK_TEMPERATURE  # Slight randomness for variety, but low for consistency
-            }
-            try:
-                response = requests.post(GROK_API_URL, headers=headers, json=data)
-                response.raise_for_status()
-                print("Grok API response received with data: ", response.text)
-                result = response.json()
-                level_data = result['choices'][0]['message']['content']
-                quote = level_data.strip()
-            except Exception as e:
-                print(f"Error calling Grok API: {e}. Using fallback quote.")
-                quote = "You're just a slimy worm!"
-                should_save = False
-        if should_save:
-            self.save_quote(event, quote)
-        NEXT_QUOTES[event].append(quote)
-
-        print("Generated bird quote with Grok API.")
-
-
+            self.update()
 
     def run(self):
         running = True
+        first_frame = True
+        accumulator = 0.0
+        last_time = time.perf_counter()
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -1414,31 +3498,132 @@ class Game:
                             self.click_sound.play()
                             self.state = 'menu'
                 elif event.type == pygame.KEYUP:
-                    if self.state == 'playing' and not self.game_over and event.key == pygame.K_SPACE and self.snake.length > 2 and self.bomb_cooldown == 0:
-                        head = self.snake.segments[0]
-                        x = head['x']
-                        y = head['y']
-                        angle = self.snake.facing_angle
-                        vx = math.cos(angle) * BOMB_SPEED
-                        vy = math.sin(angle) * BOMB_SPEED
-                        self.bombs.append(Bomb(x, y, vx, vy))
-                        # Cost 2 segments
-                        self.snake.length -= 2
-                        self.snake.segments = deque(list(self.snake.segments)[:self.snake.length])
-                        self.bombs_shot += 1
+                    if self.state == 'playing' and event.key == pygame.K_SPACE:
+                        self.fire_requested = True
+                elif event.type == pygame.WINDOWEXPOSED:
+                    # The window contents were lost, present the whole next frame
+                    self.menu_shown = None
+                    self.renderer.invalidate()
             
 
             
+            now = time.perf_counter()
+            accumulator += min(now - last_time, MAX_FRAME_TIME)
+            last_time = now
+            steps = 0
+            while accumulator >= SIM_DT and steps < MAX_CATCH_UP_STEPS:
+                self.step()
+                accumulator -= SIM_DT
+                steps += 1
+            if accumulator >= SIM_DT:
+                # Too far behind, drop the backlog instead of spiralling into slow motion
+                accumulator %= SIM_DT
+            if self.live_quote_event is not None:
+                self.poll_live_quote()
+
             if self.state == 'menu':
                 self.draw_menu()
             else:
-                self.update()
-                self.draw()
-            self.clock.tick(FPS)
-        
+                self.draw(accumulator / SIM_DT)
+            if first_frame:
+                first_frame = False
+                self.trace.mark('first frame')
+                self.trace.report()
+                self.load_quotes()
+            elif not self.assets_loaded and self.assets.ready():
+                self.finish_assets()
+            self.clock.tick(RENDER_FPS)
+
+        self.save_recording()
+        if self.quote_pool:
+            self.quote_pool.close()
+        self.quote_log.close()
+        QUOTE_CACHE.save()
         pygame.quit()
         sys.exit()
 
+    def run_headless(self, frames, restart_on_game_over=True):
+        # Step the simulation as fast as the CPU allows, no drawing and no frame cap
+        self.state = 'playing'
+        self.reset_game()
+        games = 1
+        stepped = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            if self.game_over:
+                if not restart_on_game_over:
+                    break
+                self.reset_game()
+                games += 1
+            self.update()
+            stepped += 1
+        elapsed = time.perf_counter() - start
+        return {
+            'frames': stepped,
+            'games': games,
+            'elapsed': elapsed,
+            'fps': stepped / elapsed if elapsed > 0 else 0.0,
+        }
+
+def random_input(seed=None, hold_frames=30):
+    # Input source that holds a random direction for a while, handy for soak tests
+    rng = random.Random(seed)
+    state = {'dir': (0, 0), 'left': 0}
+    def source(game):
+        if state['left'] <= 0:
+            state['dir'] = (rng.randint(-1, 1), rng.randint(-1, 1))
+            state['left'] = rng.randint(1, hold_frames)
+        state['left'] -= 1
+        return state['dir'][0], state['dir'][1], rng.random() < 0.01
+    return source
+
+def seed_arg(text):
+    # Replays store the seed as a uint32, so reject anything that would not fit
+    seed = int(text)
+    if not 0 <= seed < 2 ** 32:
+        raise ValueError(text)
+    return seed
+
+def create_headless_game(input_source=None):
+    return Game(headless=True, input_source=input_source)
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    import argparse
+    parser = argparse.ArgumentParser(description="sn[AI]ke")
+    parser.add_argument('--headless', type=int, metavar='FRAMES', help="simulate FRAMES frames without a window or audio")
+    parser.add_argument('--random-input', action='store_true', help="drive the headless snake with random input")
+    parser.add_argument('--seed', type=seed_arg, help="seed every run with SEED (0 to 2**32 - 1)")
+    parser.add_argument('--record', metavar='PATH', help="record the last run to a replay file")
+    parser.add_argument('--replay', metavar='PATH', help="verify a replay file headlessly")
+    parser.add_argument('--seek', type=int, metavar='FRAME', help="with --replay, time a jump to FRAME")
+    parser.add_argument('--dirty-rects', action='store_true', help="only redraw and present the changed parts of the screen")
+    parser.add_argument('--build-bundle', action='store_true', help="pre-decode every asset into " + ASSET_BUNDLE_PATH)
+    parser.add_argument('--trace-startup', action='store_true', help="print how long each startup phase took")
+    args = parser.parse_args()
+    trace = StartupTrace(args.trace_startup)
+    trace.mark('imports')
+    if args.build_bundle:
+        size = AssetManager.build_bundle()
+        print(f"Wrote {ASSET_BUNDLE_PATH} ({size / 1e6:.1f} MB)")
+    elif args.replay:
+        replay = Replay.load(args.replay)
+        player = ReplayPlayer(replay, create_headless_game())
+        if args.seek is not None:
+            start = time.perf_counter()
+            player.seek(args.seek)
+            print(f"Seeked to frame {player.game.frame_count} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        else:
+            desync = player.verify()
+            if desync is None:
+                print(f"Replay verified: {replay.frames} frames, seed {replay.seed}")
+            else:
+                print(f"Replay diverged at frame {desync}")
+                sys.exit(1)
+    elif args.headless is not None:
+        game = Game(headless=True, input_source=random_input(args.seed) if args.random_input else None, seed=args.seed, record_path=args.record)
+        stats = game.run_headless(args.headless, restart_on_game_over=not args.record)
+        game.save_recording()
+        print(f"{stats['frames']} frames, {stats['games']} games in {stats['elapsed']:.2f}s ({stats['fps']:.0f} fps)")
+    else:
+        game = Game(seed=args.seed, record_path=args.record, dirty_rects=args.dirty_rects, trace=trace)
+        game.run()
@@ -0,0 +1,58 @@
+# Compares Snake.hits_body() against a brute-force test of the head against every segment
+# from SELF_COLLISION_MIN_SEGMENT on, over random runs that curl the snake into itself.
+# Short snakes matter most: their trail barely covers the body, so the tail is parked on it.
+#
+#   python tools/check_collision.py
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import main
+
+RUNS = 200
+FRAMES = 600
+LENGTHS = range(20, 61)  # starting lengths, around and past the broadphase's first index
+
+def brute_force(snake, first_index=main.SELF_COLLISION_MIN_SEGMENT):
+    dx = snake.seg_x[first_index:snake.length] - snake.head_x
+    dy = snake.seg_y[first_index:snake.length] - snake.head_y
+    limit = snake.radius * 2
+    return bool(np.any(dx * dx + dy * dy < limit * limit))
+
+def run(seed):
+    # Returns (frames where the two disagree, frames with a real overlap)
+    rng = random.Random(seed)
+    snake = main.Snake(main.REST_POSITION, main.SCREEN_HEIGHT // 2, rng)
+    for _ in range(rng.choice(LENGTHS) - snake.length):
+        snake.grow()
+    camera_x = 0.0
+    direction = (0, 0)
+    mismatches = overlaps = 0
+    for frame in range(FRAMES):
+        if frame % rng.randint(4, 20) == 0:
+            # Short holds turn the snake tightly enough to cross its own body
+            direction = (rng.randint(-1, 1), rng.randint(-1, 1))
+        if rng.random() < 0.01:
+            snake.grow()
+        camera_x += main.SCROLL_SPEED
+        snake.move(direction[0], direction[1], camera_x)
+        expected = brute_force(snake)
+        overlaps += expected
+        mismatches += snake.hits_body() != expected
+    return mismatches, overlaps
+
+if __name__ == "__main__":
+    failed = []
+    total_overlaps = 0
+    for seed in range(RUNS):
+        mismatches, overlaps = run(seed)
+        total_overlaps += overlaps
+        if mismatches:
+            failed.append((seed, mismatches))
+    assert total_overlaps, "no run ever overlapped itself, the check proves nothing"
+    assert not failed, f"hits_body() disagreed with the brute-force test in {len(failed)} of {RUNS} runs (seed, frames): {failed[:10]}"
+    print(f"collision: ok, {RUNS} runs agree with the brute-force test over {total_overlaps} overlapping frames")
@@ -0,0 +1,35 @@
+# Smoke check of the headless simulation, with and without an input source, in-process and
+# through the command line. Nothing here may need a window or an audio device.
+#
+#   python tools/check_headless.py
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # main loads its assets relative to the repo
+
+import pygame
+import main
+
+FRAMES = 600
+
+def check_in_process():
+    for name, source in (('no input', None), ('random input', main.random_input(seed=1))):
+        game = main.create_headless_game(source)
+        stats = game.run_headless(FRAMES)
+        assert stats['frames'] == FRAMES, f"{name}: stepped {stats['frames']} of {FRAMES} frames"
+        assert not pygame.display.get_init(), f"{name}: the headless game opened the video system"
+        print(f"in process, {name}: ok, {stats['frames']} frames in {stats['games']} games")
+
+def check_command_line():
+    for args in ([], ['--random-input']):
+        command = [sys.executable, 'main.py', '--headless', str(FRAMES)] + args
+        result = subprocess.run(command, capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, f"{' '.join(command[1:])} failed:\n{result.stderr}"
+        print(f"{' '.join(command[1:])}: ok, {result.stdout.strip().splitlines()[-1]}")
+
+if __name__ == "__main__":
+    check_in_process()
+    check_command_line()
@@ -0,0 +1,179 @@
+# End-to-end checks of the quote workers against the local stand-in server, no API key needed.
+#
+#   python tools/check_quotes.py            # every check
+#   python tools/check_quotes.py prefetch   # just the named ones
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # main loads its assets and quotes relative to the repo
+
+import main
+import quote_server
+
+TIMEOUT = 5.0  # seconds a check waits for the workers
+
+def wait_for(condition, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def check_prefetch():
+    # top_up_all() should fill every buffer to its prefetch depth, mostly in batched calls
+    server = quote_server.start()
+    buffers = {event: [] for event in main.QUOTE_EVENTS}
+    pool = main.QuoteWorkerPool(buffers=buffers, api_url=server.url, api_key='test')
+    try:
+        pool.top_up_all()
+        full = lambda: all(len(buffers[event]) >= main.QUOTE_PREFETCH_DEPTH[event] for event in buffers)
+        assert wait_for(full), f"buffers never filled: { {event: len(quotes) for event, quotes in buffers.items()} }"
+        assert not any(pool.pending.values()), f"requests left pending: {pool.pending}"
+        wanted = sum(main.QUOTE_PREFETCH_DEPTH.values())
+        assert len(server.calls) < wanted, f"{len(server.calls)} calls for {wanted} quotes, nothing was batched"
+        # Using a quote queues exactly one refill
+        buffers['nibble'].pop()
+        calls = len(server.calls)
+        pool.top_up('nibble')
+        assert wait_for(lambda: len(buffers['nibble']) == main.QUOTE_PREFETCH_DEPTH['nibble']), "nibble wasn't refilled"
+        assert len(server.calls) == calls + 1, f"refill took {len(server.calls) - calls} calls"
+    finally:
+        pool.close()
+        server.shutdown()
+    print(f"prefetch: ok, {wanted} quotes in {calls} calls")
+
+def check_urgent():
+    # An urgent top-up jumps ahead of queued prefetches, even when the event's own prefetches
+    # are already pending
+    server = quote_server.start(latency=0.2)
+    buffers = {event: [] for event in main.QUOTE_EVENTS}
+    pool = main.QuoteWorkerPool(buffers=buffers, api_url=server.url, api_key='test', workers=1, batch_size=1, streaming=False)
+    try:
+        pool.top_up_all()
+        assert wait_for(lambda: server.calls), "no call went out"
+        pool.top_up('nibble', urgent=True)
+        pool.top_up('nibble', urgent=True)  # still queued, asking again changes nothing
+        depth = main.QUOTE_PREFETCH_DEPTH['nibble']
+        assert pool.pending['nibble'] == depth + 1, f"{pool.pending['nibble']} nibble requests pending"
+        assert wait_for(lambda: len(server.calls) > 1), "no second call went out"
+        assert server.calls[1] == {'nibble': 1}, f"urgent request went out behind prefetches: {server.calls[:3]}"
+        assert wait_for(lambda: not any(pool.pending.values()), timeout=TIMEOUT * 2), f"requests left pending: {pool.pending}"
+        assert len(buffers['nibble']) == depth + 1 and not pool.urgent
+    finally:
+        pool.close()
+        server.shutdown()
+    print("urgent: ok, the urgent request went out next")
+
+def check_stream():
+    # With nothing buffered, the bird's quote streams in: partial text has to reach the dialogue
+    # box before the finished quote is stored, then the box settles on the stored quote
+    server = quote_server.start()
+    history = []
+    main.USE_TEXT_QUOTES = False
+    for quotes in main.NEXT_QUOTES.values():
+        quotes.clear()
+    pool = main.QuoteWorkerPool(api_url=server.url, api_key='test', prefetch_depth={event: 0 for event in main.QUOTE_EVENTS},
+                                accept=lambda event, quote: history.append(('saved', quote, False)) or True)
+    game = main.create_headless_game()
+    game.quote_pool = pool
+    try:
+        game.bird = main.Bird(main.SCREEN_WIDTH - 100, main.SCREEN_HEIGHT // 2, game.bird_frames)
+        set_text = game.bird.set_text
+        game.bird.set_text = lambda text, partial=False: history.append(('shown', text, partial)) or set_text(text, partial)
+        game.get_quote_by_event('appeared')
+        assert game.live_quote_event == 'appeared', "quote wasn't streamed"
+        def poll():
+            game.poll_live_quote()
+            return game.live_quote_event is None
+        assert wait_for(poll), "stream never finished"
+        partial = [i for i, (kind, _, is_partial) in enumerate(history) if kind == 'shown' and is_partial]
+        saved = [i for i, (kind, _, _) in enumerate(history) if kind == 'saved']
+        assert partial, "no partial text reached the dialogue box"
+        assert len(saved) == 1 and partial[0] < saved[0], f"quote stored before any partial text was shown: {history}"
+        final = history[saved[0]][1]
+        assert history[-1] == ('shown', final, False), f"dialogue box didn't settle on the stored quote: {history[-1]}"
+        assert all(final.startswith(history[i][1]) for i in partial), "partial text isn't a prefix of the quote"
+    finally:
+        pool.close()
+        server.shutdown()
+    print(f"stream: ok, {len(partial)} partial updates before {final!r} was stored")
+
+def check_faults():
+    # Slow tails get hedged, stalled reads and 5xx answers count as failures, enough of them
+    # open the breaker, and after the cooldown exactly one probe goes through and closes it
+    read_timeout = 0.5
+    server = quote_server.start(latency=0.02, slow_every=25, slow_delay=0.4)
+    buffers = {event: [] for event in main.QUOTE_EVENTS}
+    breaker = main.CircuitBreaker(max_failures=3, cooldown=0.5)
+    pool = main.QuoteWorkerPool(buffers=buffers, api_url=server.url, api_key='test', workers=len(buffers),
+                                prefetch_depth={event: 0 for event in buffers}, streaming=False, batch_size=1,
+                                breaker=breaker, timeout=(0.5, read_timeout))
+
+    def call(event='nibble'):
+        # One urgent request, returns (seconds, quote or None)
+        start = time.perf_counter()
+        pool.top_up(event, urgent=True)
+        assert wait_for(lambda: not pool.pending[event], timeout=read_timeout * 4), f"{event} call hung"
+        return time.perf_counter() - start, buffers[event].pop() if buffers[event] else None
+
+    try:
+        # Long streams and batches are timed too, they mustn't push the single-call p95 out
+        for _ in range(main.QUOTE_LATENCY_SAMPLES):
+            pool.record_latency(['nibble'], 3.0)
+            pool.record_latency(['nibble'], 3.0, 'batch')
+        # Every 25th call is slow, once p95 is known a hedged copy should answer those instead
+        times = [call()[0] for _ in range(60)]
+        assert pool.hedges > 0, "slow calls were never hedged"
+        hedged_worst = max(times[main.QUOTE_HEDGE_MIN_SAMPLES + 1:])
+        assert hedged_worst < server.slow_delay, f"hedging didn't cut the tail, worst call took {hedged_worst:.2f}s"
+        assert not breaker.open and not breaker.failures
+
+        # A body that stalls past the read timeout fails the call rather than hanging it
+        server.fault = 'stall'
+        seconds, quote = call()
+        assert quote is None and breaker.failures == 1, "stalled read wasn't counted as a failure"
+        assert seconds < read_timeout * 3, f"stalled call took {seconds:.2f}s"
+        # 500s count too, and the third failure in a row opens the breaker
+        server.fault = 'error'
+        for _ in range(2):
+            assert call()[1] is None
+        assert breaker.open, "breaker didn't open after 3 failures"
+
+        # While open, requests are dropped without reaching the server
+        server.fault = None
+        calls = len(server.calls)
+        seconds, quote = call()
+        assert quote is None and len(server.calls) == calls, "open breaker let a call through"
+
+        # After the cooldown one probe goes through, the requests racing it are dropped
+        time.sleep(breaker.cooldown)
+        server.latency = 0.2
+        for event in buffers:
+            pool.top_up(event, urgent=True)
+        assert wait_for(lambda: not any(pool.pending.values()))
+        answered = [event for event, quotes in buffers.items() if quotes]
+        assert len(answered) == 1, f"{len(answered)} probes went through: {answered}"
+        assert not breaker.open, "successful probe didn't close the breaker"
+    finally:
+        pool.close()
+        server.shutdown()
+    print(f"faults: ok, {pool.hedges} hedged calls, worst hedged call {hedged_worst * 1000:.0f} ms")
+
+CHECKS = {
+    'prefetch': check_prefetch,
+    'urgent': check_urgent,
+    'stream': check_stream,
+    'faults': check_faults,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(CHECKS)
+    unknown = [name for name in names if name not in CHECKS]
+    if unknown:
+        sys.exit(f"Unknown check {', '.join(unknown)}, pick from: {', '.join(CHECKS)}")
+    for name in names:
+        CHECKS[name]()
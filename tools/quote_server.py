@@ -0,0 +1,148 @@
+# Local stand-in for the Grok chat completions API, for exercising the quote workers offline.
+#
+#   python tools/quote_server.py --port 8000
+#   GROK_API_URL=http://127.0.0.1:8000/v1/chat/completions GROK_API_KEY=test python main.py
+#
+# Answers plain calls with one quote, structured-output calls (response_format) with a JSON
+# object of quotes per event and streaming calls with server-sent events, one word per chunk,
+# the same shapes QuoteWorkerPool asks the real API for.
+#
+# Faults can be injected to exercise timeouts, hedging and the circuit breaker: every Nth call
+# can be slow (--slow-every), and every call can fail with a 500 or stall halfway through its
+# body (--fault). Set the same attributes on a running server to switch them on the fly.
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY = 0.05  # seconds every call takes before answering
+TOKEN_DELAY = 0.03  # seconds between streamed words
+SLOW_DELAY = 1.0  # seconds a slow call takes
+STALL_TIME = 30.0  # seconds a stalled response goes quiet mid-body
+FAULTS = ('error', 'stall')
+WORDS = """
+    slimy sluggish wiggly soggy muddy dizzy clumsy crawly squishy tiny noodle worm wriggler
+    dirt puddle pebble feather beak talon sky nest breakfast snack lunch supper crumb twig
+    tumble squirm flap swoop peck chase nibble dodge slither giggle shiver gobble cackle
+    lazy gloomy mushy pale wobbly slow timid grumpy silly bouncy tasty chewy crunchy
+    """.split()
+
+class QuoteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=LATENCY, token_delay=TOKEN_DELAY, slow_every=0,
+                 slow_delay=SLOW_DELAY, fault=None, seed=None):
+        super().__init__(address, QuoteHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.slow_every = slow_every  # every Nth call takes slow_delay, 0 for none
+        self.slow_delay = slow_delay
+        self.fault = fault  # None or one of FAULTS, applied to every call
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = []  # {event: quotes asked for} per call, oldest first
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1/chat/completions"
+
+    def quote(self, event):
+        # Random word salad, so quotes stay valid and don't trip the near-duplicate filter
+        with self.lock:
+            words = self.rng.sample(WORDS, 7)
+        return f"The {event} bird says {' '.join(words)}!"
+
+class QuoteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][-1]['content']
+        if 'response_format' in body:
+            # "Quotes wanted per event:" is followed by one "event: count" line each
+            wanted = {event: int(count) for event, count in re.findall(r'^\s*(\w+): (\d+)\s*$', prompt, re.M)}
+        else:
+            wanted = {re.search(r'Event: (\w+)', prompt).group(1): 1}
+        with self.server.lock:
+            self.server.calls.append(wanted)
+            number = len(self.server.calls)
+        if self.server.fault == 'error':
+            self.send_json({'error': {'message': 'injected failure'}}, status=500)
+            return
+        slow = self.server.slow_every and number % self.server.slow_every == 0
+        time.sleep(self.server.slow_delay if slow else self.server.latency)
+        try:
+            self.answer(body, wanted)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up on a slow or stalled call
+
+    def answer(self, body, wanted):
+        if 'response_format' in body:
+            content = json.dumps({event: [self.server.quote(event) for _ in range(count)] for event, count in wanted.items()})
+        elif body.get('stream'):
+            self.send_stream(self.server.quote(next(iter(wanted))))
+            return
+        else:
+            content = self.server.quote(next(iter(wanted)))
+        self.send_json({'choices': [{'message': {'role': 'assistant', 'content': content}}]})
+
+    def send_json(self, payload, status=200):
+        out = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        if self.server.fault == 'stall':
+            # Headers and half the body, then nothing until the client's read timeout fires
+            self.wfile.write(out[:len(out) // 2])
+            self.wfile.flush()
+            time.sleep(STALL_TIME)
+            out = out[len(out) // 2:]
+        self.wfile.write(out)
+
+    def send_stream(self, quote):
+        # Chunked server-sent events, one 'data: {delta}' per word and 'data: [DONE]' at the end
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        words = quote.split(' ')
+        for i, word in enumerate(words):
+            delta = {'choices': [{'delta': {'content': word if i == 0 else ' ' + word}}]}
+            self.send_chunk(f"data: {json.dumps(delta)}\n\n".encode())
+            time.sleep(STALL_TIME if self.server.fault == 'stall' else self.server.token_delay)
+        self.send_chunk(b"data: [DONE]\n\n")
+        self.send_chunk(b"")
+
+    def send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+def start(port=0, **options):
+    # Serves on a background thread, port 0 picks a free one
+    server = QuoteServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="stand-in Grok API for sn[AI]ke")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=LATENCY, help="seconds every call takes")
+    parser.add_argument('--token-delay', type=float, default=TOKEN_DELAY, help="seconds between streamed words")
+    parser.add_argument('--slow-every', type=int, default=0, metavar='N', help="make every Nth call slow")
+    parser.add_argument('--slow-delay', type=float, default=SLOW_DELAY, help="seconds a slow call takes")
+    parser.add_argument('--fault', choices=FAULTS, help="fail every call with a 500 or stall it mid-body")
+    args = parser.parse_args()
+    server = QuoteServer(('127.0.0.1', args.port), latency=args.latency, token_delay=args.token_delay,
+                         slow_every=args.slow_every, slow_delay=args.slow_delay, fault=args.fault)
+    print(f"Serving quotes at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass